@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import random
+import logging
+import argparse
+from datetime import date, datetime, timedelta
+
+from dailies.journal import JOURNAL_FILENAME, SHUTDOWN_MARKER, Note, note_digest, write_notes_xml
+from dailies.ledger import LEDGER_FILENAME
+from dailies.storage import write_events_xml, write_shifts_xml
+from dailies.tasks import TASKS
+
+logger = logging.getLogger("AgentX")
+
+WORDS = ("fixed", "reviewed", "deployed", "parser", "calendar", "report", "meeting", "client", "build", "shader",
+         "pipeline", "render", "budget", "sprint", "invoice", "vendor", "prototype", "sync", "share", "drive",
+         "tested", "refactor", "layout", "notes", "export", "cache", "index", "timeline", "asset", "lighting")
+EVENT_TEXTS = ("Standup", "Client review", "Dentist", "Ship build", "Payroll", "Team lunch", "Backup drive",
+               "Render farm maintenance", "Quarterly planning", "Vendor call")
+EVENT_COLORS = ("#FFFFFF", "#FFCCCC", "#CCFFCC", "#CCCCFF", "#FFFFCC")
+# Small but valid PNG, so screenshot folders look like the real thing to anything that lists them
+DUMMY_PNG = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+                          "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082")
+
+# Named data sizes used by the benchmark runner: (days, notes per day, screenshots per day)
+SIZES = {
+    "small": (14, 200, 5),
+    "medium": (120, 1000, 20),
+    "large": (730, 2000, 40),
+}
+
+
+def _sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 18)))
+
+
+def generate_day(session_dir, day, notes_per_day, screenshots_per_day, rng, journal_tail=0):
+    # One realistic day: notes spread over 08:00-18:00 with their time spans, a shift with lunch,
+    # the odd event, and dummy screenshots. journal_tail notes stay uncompacted in notes.journal.
+    os.makedirs(session_dir, exist_ok=True)
+    date_str = day.strftime("%Y-%m-%d")
+    day_start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+    step = 10 * 3600 / max(1, notes_per_day)
+    subtasks = [f"ticket-{rng.randint(100, 999)}" for _ in range(8)] + [""] * 4
+    notes = []
+    spans = []
+    task = rng.choice(TASKS)
+    previous = day_start
+    for i in range(notes_per_day):
+        when = day_start + timedelta(seconds=step * (i + 1))
+        if rng.random() < 0.1:
+            task = rng.choice(TASKS)
+        subtask = rng.choice(subtasks)
+        notes.append(Note(task, when.strftime("%H:%M:%S"), _sentence(rng), subtask))
+        spans.append([task, subtask, round(previous.timestamp(), 1), round(when.timestamp(), 1)])
+        previous = when
+    shutdown = previous + timedelta(minutes=1)
+    notes.append(Note("default", shutdown.strftime("%H:%M:%S"),
+                      f"{SHUTDOWN_MARKER}{shutdown.strftime('%Y-%m-%d %H:%M:%S')}"))
+
+    compacted, tail = (notes[:-journal_tail], notes[-journal_tail:]) if journal_tail else (notes, [])
+    write_notes_xml(os.path.join(session_dir, "notes.xml"), date_str, compacted)
+    if tail:
+        with open(os.path.join(session_dir, JOURNAL_FILENAME), "w", encoding="utf-8") as f:
+            for note in tail:
+                f.write(json.dumps({"task": note.task, "timestamp": note.timestamp, "subtask": note.subtask,
+                                    "content": note.content, "h": note_digest(note)}) + "\n")
+    with open(os.path.join(session_dir, LEDGER_FILENAME), "w", encoding="utf-8") as f:
+        for span in spans:
+            f.write(json.dumps(span) + "\n")
+
+    write_shifts_xml(session_dir, date_str, [
+        {"type": "work_in", "timestamp": "08:00:00"},
+        {"type": "lunch_out", "timestamp": "12:00:00"},
+        {"type": "lunch_in", "timestamp": "12:30:00", "duration": 30.0},
+        {"type": "work_out", "timestamp": "18:00:00", "worked": 570.0},
+    ])
+    if rng.random() < 0.3:
+        write_events_xml(session_dir, date_str, [
+            {"text": rng.choice(EVENT_TEXTS), "complete": rng.random() < 0.5, "color": rng.choice(EVENT_COLORS)}
+            for _ in range(rng.randint(1, 4))])
+
+    for i in range(screenshots_per_day):
+        note = notes[(i * len(notes)) // max(1, screenshots_per_day)]
+        task_dir = os.path.join(session_dir, note.task)
+        os.makedirs(task_dir, exist_ok=True)
+        with open(os.path.join(task_dir, f"screenshot_{note.task}_{note.timestamp.replace(':', '-')}.png"),
+                  "wb") as f:
+            f.write(DUMMY_PNG)
+    return len(notes)
+
+
+def generate_sessions(base_dir, days, notes_per_day, screenshots_per_day=10, end=None, seed=1):
+    # Writes `days` consecutive day folders ending at `end` (default today). Weekends are skipped
+    # like a real work calendar; the newest day keeps a journal tail as if the app were still open.
+    rng = random.Random(seed)
+    end = end or date.today()
+    day = end
+    written = 0
+    total_notes = 0
+    while written < days:
+        if day.weekday() < 5:
+            journal_tail = min(50, notes_per_day // 4) if written == 0 else 0
+            total_notes += generate_day(os.path.join(base_dir, day.strftime("%Y-%m-%d")), day, notes_per_day,
+                                        screenshots_per_day, rng, journal_tail)
+            written += 1
+        day -= timedelta(days=1)
+    logger.info("Generated %d days / %d notes under %s", written, total_notes, base_dir)
+    return written, total_notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.generate",
+                                     description="Write a synthetic Dailies sessions tree")
+    parser.add_argument("base_dir", help="directory to fill with day folders")
+    parser.add_argument("--size", choices=sorted(SIZES), help="preset for days/notes/screenshots")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--notes", type=int, default=500, help="notes per day")
+    parser.add_argument("--screenshots", type=int, default=10, help="screenshots per day")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    days, notes, screenshots = SIZES[args.size] if args.size else (args.days, args.notes, args.screenshots)
+    generate_sessions(args.base_dir, days, notes, screenshots, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+from bench.generate import SIZES, generate_sessions
+from dailies.index import SessionIndex
+from dailies.journal import Note, NoteJournal
+from dailies.reports import _cache_path, finish_day_report, generate_day_report, generate_range_report
+from dailies.storage import read_events_xml, read_shifts_xml
+from dailies.tasks import TASK_COLORS
+
+logger = logging.getLogger("AgentX")
+
+# A benchmark only counts as regressed when it is both this much slower than the baseline and slower
+# by more than NOISE_FLOOR_MS; sub-millisecond timings jitter too much on shared CI runners.
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_MS = 2.0
+APPEND_COUNT = 200
+GENERATED_MARKER = ".bench_generated"
+
+
+def _days(base_dir):
+    return sorted(name for name in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, name))
+                  and name[:4].isdigit())
+
+
+def _time(fn, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"min_ms": round(min(samples), 3), "median_ms": round(statistics.median(samples), 3),
+            "repeat": repeat}
+
+
+def _drop_report_cache(session_dir, date_str):
+    try:
+        os.remove(_cache_path(session_dir, date_str))
+    except FileNotFoundError:
+        pass
+
+
+def run_size(base_dir, scratch_dir, repeat):
+    # Each entry maps to a code path the GUI drives: load_session is startup's note load,
+    # read_shifts/read_events the per-day shift and event loads, month_events the calendar
+    # page, search_* the search panel, journal_append the note save path, and the report
+    # entries close-of-day and the reports window. Nothing here needs Qt. base_dir is only ever
+    # read: it may be a --data-dir tree the next run measures again.
+    days = _days(base_dir)
+    today, past = days[-1], days[max(0, len(days) - 6)]
+    today_dir, past_dir = os.path.join(base_dir, today), os.path.join(base_dir, past)
+    newest = datetime.strptime(today, "%Y-%m-%d")
+    results = {}
+
+    results["load_session"] = _time(lambda: NoteJournal(today_dir, today, TASK_COLORS).load_session(), repeat)
+    results["read_shifts"] = _time(lambda: read_shifts_xml(os.path.join(past_dir, "shifts.xml")), repeat)
+    results["read_events_all_days"] = _time(
+        lambda: [read_events_xml(os.path.join(base_dir, d, "events.xml")) for d in days], repeat)
+
+    index_path = os.path.join(scratch_dir, "index.sqlite")
+
+    def fresh_index():
+        for suffix in ("", "-journal", "-wal"):
+            if os.path.exists(index_path + suffix):
+                os.remove(index_path + suffix)
+
+    def month_events():
+        index = SessionIndex(index_path)
+        try:
+            index.month_events(base_dir, newest.year, newest.month)
+        finally:
+            index.close()
+
+    results["month_events_cold"] = _time(month_events, repeat, setup=fresh_index)
+    results["month_events_warm"] = _time(month_events, repeat)
+
+    def refresh_index():
+        index = SessionIndex(index_path)
+        try:
+            index.refresh(base_dir)
+        finally:
+            index.close()
+
+    results["search_index_build"] = _time(refresh_index, 1, setup=fresh_index)
+    search_index = SessionIndex(index_path)
+    try:
+        results["search_query"] = _time(lambda: search_index.search("shader pipeline"), repeat)
+        results["search_query_rare"] = _time(lambda: search_index.search("quarterly planning"), repeat)
+    finally:
+        search_index.close()
+
+    journal_dir = os.path.join(scratch_dir, today)
+
+    def fresh_journal():
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        os.makedirs(journal_dir)
+
+    def append_notes():
+        journal = NoteJournal(journal_dir, today, TASK_COLORS)
+        journal.load()
+        for i in range(APPEND_COUNT):
+            journal.append(Note("code", f"09:{i // 60:02d}:{i % 60:02d}", f"bench note {i}", "bench"))
+
+    results["journal_append_x%d" % APPEND_COUNT] = _time(append_notes, repeat, setup=fresh_journal)
+
+    # Everything below writes reports, caches or compacts journals, so it runs on a copy
+    work_dir = os.path.join(scratch_dir, "sessions")
+    shutil.copytree(base_dir, work_dir)
+    work_past_dir, work_today_dir = os.path.join(work_dir, past), os.path.join(work_dir, today)
+
+    def fresh_today():
+        # Finishing compacts the journal tail away; every repeat starts from the generated day again
+        shutil.rmtree(work_today_dir)
+        shutil.copytree(today_dir, work_today_dir)
+
+    results["day_report_cold"] = _time(lambda: generate_day_report(work_dir, past), repeat,
+                                       setup=lambda: _drop_report_cache(work_past_dir, past))
+    results["day_report_cached"] = _time(lambda: generate_day_report(work_dir, past), repeat)
+    results["finish_today_report"] = _time(lambda: finish_day_report(work_dir, today), repeat, setup=fresh_today)
+
+    month_start = newest - timedelta(days=30)
+    results["range_report_month"] = _time(lambda: generate_range_report(work_dir, month_start, newest), repeat)
+    first = datetime.strptime(days[0], "%Y-%m-%d")
+    results["range_report_all"] = _time(lambda: generate_range_report(work_dir, first, newest), 1)
+    return results
+
+
+def _prepare(data_dir, size):
+    # Generated trees are kept between runs: the large one takes a while to write
+    base_dir = os.path.join(data_dir, size)
+    marker = os.path.join(base_dir, GENERATED_MARKER)
+    days, notes, screenshots = SIZES[size]
+    if os.path.exists(marker):
+        with open(marker, "r", encoding="utf-8") as f:
+            if json.load(f) == [days, notes, screenshots]:
+                return base_dir
+    shutil.rmtree(base_dir, ignore_errors=True)
+    started = time.perf_counter()
+    generate_sessions(base_dir, days, notes, screenshots)
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump([days, notes, screenshots], f)
+    logger.info("Generated %s tree in %.1f s", size, time.perf_counter() - started)
+    return base_dir
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # Compares min times, the least noisy statistic. Benchmarks missing from either side are ignored.
+    regressions = []
+    for size, benches in results["sizes"].items():
+        for name, result in benches.items():
+            old = baseline.get("sizes", {}).get(size, {}).get(name)
+            if old is None:
+                continue
+            new_ms, old_ms = result["min_ms"], old["min_ms"]
+            if new_ms > old_ms * (1 + tolerance) and new_ms - old_ms > NOISE_FLOOR_MS:
+                regressions.append((size, name, old_ms, new_ms))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.run",
+                                     description="Time Dailies' file and report paths on synthetic session trees")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", help="where generated trees are kept between runs (default: a temp dir)")
+    parser.add_argument("--output", default="bench_results.json", help="results JSON to write")
+    parser.add_argument("--baseline", help="baseline JSON to compare against; regressions exit with status 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown as a fraction (default 0.25)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    logger.setLevel(logging.WARNING)
+
+    temp_dir = None
+    data_dir = args.data_dir
+    if data_dir is None:
+        temp_dir = data_dir = tempfile.mkdtemp(prefix="dailies_bench_")
+    results = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                        "created": datetime.now().isoformat(timespec="seconds"), "repeat": args.repeat},
+               "sizes": {}}
+    try:
+        for size in args.sizes:
+            base_dir = _prepare(data_dir, size)
+            scratch_dir = tempfile.mkdtemp(prefix=f"dailies_bench_{size}_")
+            try:
+                results["sizes"][size] = run_size(base_dir, scratch_dir, args.repeat)
+            finally:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+            for name, result in results["sizes"][size].items():
+                print(f"{size:<7} {name:<26} min {result['min_ms']:>10.2f} ms   median {result['median_ms']:>10.2f} ms")
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for size, name, old_ms, new_ms in regressions:
+            print(f"REGRESSION {size} {name}: {old_ms:.2f} ms -> {new_ms:.2f} ms")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime
+
+from dailies.config import load_config, session_dirs
+from dailies.index import SessionIndex
+from dailies.logs import setup_logging
+from dailies.sync import Synchronizer
+from dailies.reports import dates_between, finish_day_report, generate_day_report, generate_day_reports, generate_range_report
+
+logger = logging.getLogger("AgentX")
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m dailies", description="Headless Dailies tools")
+    parser.add_argument("--quiet", action="store_true",
+                        help="log only to the configured log file, not to stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    report = sub.add_parser("report", help="generate HTML/XML reports without the GUI")
+    report.add_argument("--from", dest="start", type=_parse_date, required=True, help="first day, YYYY-MM-DD")
+    report.add_argument("--to", dest="end", type=_parse_date, help="last day, YYYY-MM-DD (defaults to --from)")
+    report.add_argument("--daily", action="store_true",
+                        help="also write the per-day report into every session directory in the range")
+    report.add_argument("--base-dir", help="sessions directory (defaults to base_dir from the config)")
+    report.add_argument("--workers", type=int, help="process pool size for parsing many days")
+    report.add_argument("--open", action="store_true", help="open the resulting HTML report in a browser")
+    report.add_argument("--compact", action="store_true",
+                        help="fold the day's note journal into notes.xml first (single day only)")
+    report.add_argument("--sync", action="store_true", help="sync the reported days with the share afterwards")
+
+    sync = sub.add_parser("sync", help="two-way sync of the local session store with the share")
+    sync.add_argument("--local", help="local sessions directory (defaults to local_dir from the config)")
+    sync.add_argument("--remote", help="shared sessions directory (defaults to base_dir from the config)")
+    sync.add_argument("--date", dest="dates", action="append", type=_parse_date,
+                      help="only sync this day, YYYY-MM-DD (repeatable; default is every day)")
+
+    search = sub.add_parser("search", help="full-text search over every day's notes, subtasks and events")
+    search.add_argument("query", nargs="+", help="words to find; each matches as a prefix")
+    search.add_argument("--base-dir", help="sessions directory (defaults to base_dir from the config)")
+    search.add_argument("--limit", type=int, default=50, help="most recent hits to show")
+    return parser
+
+
+def _default_base_dir(config):
+    local_dir, share_dir = session_dirs(config)
+    # A machine that never ran the app has no local store yet; read the share directly then
+    return local_dir if share_dir is None or os.path.isdir(local_dir) else share_dir
+
+
+def run_report(args, config):
+    base_dir = args.base_dir or _default_base_dir(config)
+    start, end = args.start, args.end or args.start
+    if end < start:
+        start, end = end, start
+    if start == end:
+        render = finish_day_report if args.compact else generate_day_report
+        html_path = render(base_dir, start.strftime("%Y-%m-%d"))
+        if html_path is None:
+            print(f"No notes found for {start}", file=sys.stderr)
+            return 1
+    else:
+        if args.daily:
+            written = generate_day_reports(base_dir, start, end, max_workers=args.workers)
+            print(f"Wrote {len(written)} daily reports")
+        html_path = generate_range_report(base_dir, start, end, max_workers=args.workers)
+    print(html_path)
+    if args.sync:
+        local_dir, share_dir = session_dirs(config)
+        if share_dir is not None and os.path.abspath(base_dir) == os.path.abspath(local_dir):
+            days = list(dates_between(start, end))
+            print(Synchronizer(local_dir, share_dir).sync(days).summary())
+    if args.open:
+        import webbrowser
+        webbrowser.open(f"file://{html_path}")
+    return 0
+
+
+def run_sync(args, config):
+    local_dir, share_dir = session_dirs(config)
+    local_dir = args.local or local_dir
+    share_dir = args.remote or share_dir or config["base_dir"]
+    dates = [d.strftime("%Y-%m-%d") for d in args.dates] if args.dates else None
+    result = Synchronizer(local_dir, share_dir).sync(dates)
+    print(result.summary())
+    for rel in result.conflicts:
+        print(f"conflict: {rel}")
+    return 1 if result.error else 0
+
+
+def run_search(args, config):
+    # Shares the app's index file: days it already indexed are only stat'ed here
+    index = SessionIndex(config["index_path"])
+    try:
+        index.refresh(args.base_dir or _default_base_dir(config))
+        hits = index.search(" ".join(args.query), args.limit)
+    finally:
+        index.close()
+    for date_str, kind, timestamp, task, subtask, snippet in hits:
+        where = "event" if kind == "event" else f"{timestamp} [{task}{'/' + subtask if subtask else ''}]"
+        print(f"{date_str} {where} {snippet}")
+    return 0 if hits else 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config()
+    log_listener = setup_logging(config["log_level"], config["log_path"], config["log_max_bytes"],
+                                 config["log_backups"], config["log_console"] and not args.quiet)
+    try:
+        if args.command == "report":
+            return run_report(args, config)
+        if args.command == "sync":
+            return run_sync(args, config)
+        if args.command == "search":
+            return run_search(args, config)
+        return 2
+    finally:
+        log_listener.stop()
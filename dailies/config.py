@@ -0,0 +1,72 @@
+import os
+import copy
+import json
+import logging
+
+logger = logging.getLogger("AgentX")
+
+# Optional JSON overrides live next to main.py unless DAILIES_CONFIG points elsewhere
+CONFIG_PATH = os.environ.get(
+    "DAILIES_CONFIG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dailies.json"))
+
+DEFAULT_CONFIG = {
+    # Base directory for sessions
+    "base_dir": r"G:\expo\Software\Dailies\Dailies\dailies\sessions",
+    # Local primary copy of the sessions, synced with base_dir in the background; empty works on base_dir directly
+    "local_dir": os.path.join(os.path.expanduser("~"), ".dailies", "sessions"),
+    "sync_interval_s": 120,
+    # Kept on the local disk: SQLite and network shares do not mix
+    "index_path": os.path.join(os.path.expanduser("~"), ".dailies", "session_index.sqlite"),
+    "event_months_cached": 6,
+    "event_save_delay_ms": 750,  # debounce window for event edits
+    "flush_interval_s": 60,  # how often the running time span is checkpointed to disk
+    # What happens to the day's report at close: "background" renders it in a detached
+    # `python -m dailies report` process, "next_start" on the next launch, "off" never
+    "report_on_close": "background",
+    # Every startup appends its phase timings here; empty string turns it off
+    "startup_profile_path": os.path.join(os.path.expanduser("~"), ".dailies", "startup_profile.jsonl"),
+    # DEBUG, INFO, WARNING or ERROR; records go through a queue to a rotating file (and stderr)
+    "log_level": "INFO",
+    "log_path": os.path.join(os.path.expanduser("~"), ".dailies", "dailies.log"),
+    "log_max_bytes": 2_000_000,
+    "log_backups": 3,
+    "log_console": True,
+    # Per-operation latency histograms (Ctrl+Shift+D shows them); off costs next to nothing
+    "metrics_enabled": False,
+    "metrics_path": os.path.join(os.path.expanduser("~"), ".dailies", "metrics.json"),
+    "screenshot": {
+        "format": "PNG",  # PNG, JPEG or WEBP
+        "quality": 85,  # JPEG/WebP only
+        "max_width": 0,  # downscale wider captures to this width, 0 keeps full size
+        "workers": 2,
+    },
+}
+
+
+def _merge(base, overrides):
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def session_dirs(config):
+    # (directory the app reads and writes, share to sync it with or None)
+    if config["local_dir"]:
+        return config["local_dir"], config["base_dir"]
+    return config["base_dir"], None
+
+
+def load_config(path=CONFIG_PATH):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _merge(config, json.load(f))
+            logger.info("Loaded config overrides from %s", path)
+        except (OSError, ValueError) as e:
+            logger.error("Failed to read config %s: %s - Using defaults, Plan B!", path, str(e))
+    return config
@@ -0,0 +1,112 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("AgentX")
+
+
+def month_of(date_str):
+    return int(date_str[:4]), int(date_str[5:7])
+
+
+def adjacent_months(year, month):
+    prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return prev_month, next_month
+
+
+class MonthEventStore:
+    # Dict-like view of date_str -> event list that only keeps a handful of months in memory.
+    # loader(year, month) returns {date_str: [event, ...]} for that month; least recently used
+    # months are evicted past capacity and re-read on demand. Every load runs on the prefetch thread,
+    # even one month() has to wait for, so the loader never runs on the caller's (GUI) thread.
+    # on_loaded(year, month) fires from the prefetch thread when a load lands.
+    def __init__(self, loader, capacity=6, on_loaded=None):
+        self._loader = loader
+        self.capacity = max(3, capacity)
+        self._on_loaded = on_loaded
+        self._months = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EventPrefetch")
+
+    def month(self, year, month):
+        key = (year, month)
+        with self._lock:
+            if key in self._months:
+                self._months.move_to_end(key)
+                return self._months[key]
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._executor.submit(self._prefetch, key)
+        future.result()
+        with self._lock:
+            if key in self._months:
+                self._months.move_to_end(key)
+                return self._months[key]
+        # The background load failed and logged why; loading here lets the error reach the caller
+        return self._store(key, self._loader(year, month))
+
+    def prefetch(self, year, month):
+        key = (year, month)
+        with self._lock:
+            if key in self._months or key in self._inflight:
+                return
+            self._inflight[key] = self._executor.submit(self._prefetch, key)
+
+    def _prefetch(self, key):
+        try:
+            self._store(key, self._loader(*key))
+        except Exception as e:
+            logger.error("Failed to prefetch events for %04d-%02d: %s", key[0], key[1], str(e))
+            return
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        if self._on_loaded is not None:
+            self._on_loaded(*key)
+
+    def _store(self, key, events):
+        with self._lock:
+            # A month loaded in the meantime may already carry edits; never clobber it
+            if key not in self._months:
+                self._months[key] = events
+            self._months.move_to_end(key)
+            while len(self._months) > self.capacity:
+                evicted, _ = self._months.popitem(last=False)
+                logger.debug("Evicted events for %04d-%02d from the month cache", *evicted)
+            return self._months[key]
+
+    def invalidate(self, year, month):
+        # The month changed on disk behind the cache (a sync pulled it); the next access re-reads it
+        with self._lock:
+            self._months.pop((year, month), None)
+
+    def is_loaded(self, year, month):
+        with self._lock:
+            return (year, month) in self._months
+
+    def peek(self, date_str):
+        # Never loads: painting must not block on the share
+        with self._lock:
+            events = self._months.get(month_of(date_str))
+        return events.get(date_str) if events is not None else None
+
+    def get(self, date_str, default=None):
+        return self.month(*month_of(date_str)).get(date_str, default)
+
+    def __contains__(self, date_str):
+        return date_str in self.month(*month_of(date_str))
+
+    def __getitem__(self, date_str):
+        return self.month(*month_of(date_str))[date_str]
+
+    def __setitem__(self, date_str, event_list):
+        self.month(*month_of(date_str))[date_str] = event_list
+
+    def __delitem__(self, date_str):
+        del self.month(*month_of(date_str))[date_str]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import sqlite3
+import calendar
+import logging
+import threading
+from datetime import date
+
+from dailies.journal import SHUTDOWN_MARKER, NoteJournal, is_time_note
+from dailies.storage import read_events_xml
+
+logger = logging.getLogger("AgentX")
+
+DAY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    dir_mtime REAL NOT NULL,
+    events_mtime REAL NOT NULL DEFAULT 0,
+    notes_mtime REAL NOT NULL DEFAULT 0,
+    events TEXT NOT NULL DEFAULT '[]'
+)
+"""
+
+# Full-text index over notes and events. Rowids are laid out per day (see _day_rowids), so a day's rows
+# are one rowid range: replacing a day is a range delete, and rowid order is chronological.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+    date UNINDEXED, kind UNINDEXED, timestamp UNINDEXED, task, subtask, text
+)
+"""
+# Bumped whenever what the days table or the search index hold changes; older indexes are rebuilt
+SCHEMA_VERSION = 1
+DAY_ROWS = 1 << 20
+EVENT_ROWS_OFFSET = DAY_ROWS >> 1
+SEARCH_LIMIT = 200
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _day_rowids(date_str):
+    # (first note rowid, first event rowid, end of the day's range)
+    base = date.fromisoformat(date_str).toordinal() * DAY_ROWS
+    return base, base + EVENT_ROWS_OFFSET, base + DAY_ROWS
+
+
+def _match_query(text):
+    # User input becomes prefix terms that must all match; FTS5 operators in it are never interpreted
+    tokens = TOKEN_RE.findall(text)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _searchable(note):
+    return not is_time_note(note) and not note.content.startswith(SHUTDOWN_MARKER)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+class SessionIndex:
+    # Local SQLite summary of every day directory under BASE_DIR. Each row remembers the directory
+    # mtime it was built from, so a refresh only re-reads days that changed on the share. The same
+    # re-read feeds the full-text search index; the app's own saves update it incrementally.
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(SCHEMA)
+            self._conn.execute(SEARCH_SCHEMA)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Days indexed before search existed have no search rows: forget them so refresh re-reads them
+                self._conn.execute("DELETE FROM days")
+                self._conn.execute("DELETE FROM search")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def refresh(self, base_dir):
+        with self._lock:
+            known = dict(self._conn.execute("SELECT date, dir_mtime FROM days"))
+        seen = set()
+        changed = 0
+        with os.scandir(base_dir) as entries:
+            for entry in entries:
+                if not DAY_DIR_RE.match(entry.name) or not entry.is_dir():
+                    continue
+                seen.add(entry.name)
+                dir_mtime = entry.stat().st_mtime
+                if known.get(entry.name) != dir_mtime:
+                    self._index_day(entry.path, entry.name, dir_mtime)
+                    changed += 1
+        vanished = [d for d in known if d not in seen]
+        if vanished:
+            self._forget_days(vanished)
+        logger.info("Session index refreshed: %d of %d days re-read", changed, len(seen))
+        return changed
+
+    def refresh_month(self, base_dir, year, month):
+        # Constant cost per month: stat the month's possible day directories instead of listing BASE_DIR
+        prefix = f"{year:04d}-{month:02d}-"
+        with self._lock:
+            known = dict(self._conn.execute("SELECT date, dir_mtime FROM days WHERE date LIKE ?", (prefix + "%",)))
+        vanished = []
+        changed = 0
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            date_str = f"{prefix}{day:02d}"
+            session_dir = os.path.join(base_dir, date_str)
+            try:
+                dir_mtime = os.stat(session_dir).st_mtime
+            except FileNotFoundError:
+                if date_str in known:
+                    vanished.append(date_str)
+                continue
+            if known.get(date_str) != dir_mtime:
+                self._index_day(session_dir, date_str, dir_mtime)
+                changed += 1
+        if vanished:
+            self._forget_days(vanished)
+        return changed
+
+    def _forget_days(self, dates):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM days WHERE date = ?", [(d,) for d in dates])
+            for date_str in dates:
+                first, _, end = _day_rowids(date_str)
+                self._conn.execute("DELETE FROM search WHERE rowid >= ? AND rowid < ?", (first, end))
+
+    def month_events(self, base_dir, year, month):
+        self.refresh_month(base_dir, year, month)
+        with self._lock:
+            rows = self._conn.execute("SELECT date, events FROM days WHERE date LIKE ? AND events != '[]'",
+                                      (f"{year:04d}-{month:02d}-%",)).fetchall()
+        return {date_str: json.loads(events) for date_str, events in rows}
+
+    def _index_day(self, session_dir, date_str, dir_mtime):
+        events_file = os.path.join(session_dir, "events.xml")
+        notes_file = os.path.join(session_dir, "notes.xml")
+        event_list = read_events_xml(events_file)
+        note_rows = []
+        first, _, end = _day_rowids(date_str)
+        for note in NoteJournal(session_dir, date_str, {}).iter_notes():
+            if _searchable(note) and len(note_rows) < EVENT_ROWS_OFFSET:
+                note_rows.append((first + len(note_rows), date_str, "note", note.timestamp, note.task, note.subtask,
+                                  note.content))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO days (date, dir_mtime, events_mtime, notes_mtime, events)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (date_str, dir_mtime, _mtime(events_file), _mtime(notes_file), json.dumps(event_list)))
+            self._conn.execute("DELETE FROM search WHERE rowid >= ? AND rowid < ?", (first, end))
+            self._conn.executemany("INSERT INTO search (rowid, date, kind, timestamp, task, subtask, text)"
+                                   " VALUES (?, ?, ?, ?, ?, ?, ?)", note_rows)
+            self._insert_event_rows(date_str, event_list)
+
+    def _insert_event_rows(self, date_str, event_list):
+        # Caller holds the lock and the transaction
+        _, events_first, end = _day_rowids(date_str)
+        self._conn.execute("DELETE FROM search WHERE rowid >= ? AND rowid < ?", (events_first, end))
+        self._conn.executemany("INSERT INTO search (rowid, date, kind, timestamp, task, subtask, text)"
+                               " VALUES (?, ?, 'event', '', '', '', ?)",
+                               [(events_first + i, date_str, event["text"]) for i, event in enumerate(event_list)])
+
+    def add_note(self, date_str, note):
+        # Incremental update after our own save; the next re-read of the day replaces it with what is on disk
+        if not _searchable(note):
+            return
+        first, events_first, _ = _day_rowids(date_str)
+        with self._lock, self._conn:
+            last = self._conn.execute("SELECT max(rowid) FROM search WHERE rowid >= ? AND rowid < ?",
+                                      (first, events_first)).fetchone()[0]
+            rowid = first if last is None else last + 1
+            if rowid >= events_first:
+                return
+            self._conn.execute("INSERT INTO search (rowid, date, kind, timestamp, task, subtask, text)"
+                               " VALUES (?, ?, 'note', ?, ?, ?, ?)",
+                               (rowid, date_str, note.timestamp, note.task, note.subtask, note.content))
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        # Newest first: (date, kind, timestamp, task, subtask, snippet with the hits in [brackets])
+        query = _match_query(text)
+        if not query:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT date, kind, timestamp, task, subtask, snippet(search, 5, '[', ']', '...', 12) FROM search"
+                " WHERE search MATCH ? ORDER BY rowid DESC LIMIT ?", (query, limit)).fetchall()
+
+    def update_events(self, date_str, session_dir, event_list):
+        # Incremental update after our own save. dir_mtime is left alone on purpose: anything else
+        # that changed in the directory still gets picked up by the next refresh.
+        events_mtime = _mtime(os.path.join(session_dir, "events.xml"))
+        with self._lock, self._conn:
+            cur = self._conn.execute("UPDATE days SET events = ?, events_mtime = ? WHERE date = ?",
+                                     (json.dumps(event_list), events_mtime, date_str))
+            if cur.rowcount == 0:
+                self._conn.execute("INSERT INTO days (date, dir_mtime, events_mtime, events) VALUES (?, 0, ?, ?)",
+                                   (date_str, events_mtime, json.dumps(event_list)))
+            self._insert_event_rows(date_str, event_list)
@@ -0,0 +1,56 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger("AgentX")
+
+_STOP = object()
+
+
+class WriteQueue:
+    # One dedicated thread drains writes in submission order, so a later save of the same
+    # file can never be overtaken by an earlier one. on_done(label, ok, error, callback)
+    # is invoked on the worker thread after every job; the GUI hands in a signal emitter.
+    def __init__(self, on_done=None, name="PersistenceWorker"):
+        self._queue = queue.Queue()
+        self._on_done = on_done
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, label, fn, *args, callback=None):
+        if self._closed:
+            raise RuntimeError(f"Write queue is closed, cannot run {label}")
+        self._queue.put((label, fn, args, callback))
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self._queue.put(("flush", done.set, (), None))
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            label, fn, args, callback = job
+            ok, error = True, ""
+            try:
+                fn(*args)
+            except Exception as e:
+                ok, error = False, str(e)
+                logger.error("Background write '%s' failed: %s - Houston, we have a problem!", label, error)
+            if self._on_done is not None:
+                self._on_done(label, ok, error, callback)
+            elif callback is not None:
+                callback(ok, error)
@@ -0,0 +1,370 @@
+import os
+import sys
+import json
+import hashlib
+import logging
+import itertools
+import threading
+
+from dailies.ledger import LEGACY_TIME_PREFIX
+from dailies.storage import iter_xml, xml_attr, xml_text
+
+logger = logging.getLogger("AgentX")
+
+JOURNAL_FILENAME = "notes.journal"
+# Roughly four hours of minute ticks before the journal gets folded into notes.xml
+COMPACT_THRESHOLD = 240
+SHUTDOWN_MARKER = "the program shut down at "
+RECENT_SUBTASKS = 10
+
+
+class Note:
+    # One note of a day. Slots keep long sessions and multi-month reports from paying for a dict per
+    # note, and task/subtask names are interned so thousands of notes share a handful of strings.
+    __slots__ = ("task", "timestamp", "subtask", "content", "screenshot", "digest")
+
+    def __init__(self, task, timestamp, content, subtask="", screenshot="", digest=None):
+        self.task = sys.intern(task or "default")
+        self.timestamp = timestamp or ""
+        self.subtask = sys.intern(subtask or "")
+        self.content = content or ""
+        self.screenshot = screenshot or ""
+        self.digest = digest
+
+    def copy(self):
+        return Note(self.task, self.timestamp, self.content, self.subtask, self.screenshot, self.digest)
+
+    def __repr__(self):
+        return f"Note({self.task!r}, {self.timestamp!r}, {self.content!r}, {self.subtask!r}, {self.screenshot!r})"
+
+
+def note_digest(note):
+    # Identity of a note for dedupe. Computed once per note and then stored with it, in the journal
+    # record and as an attribute in notes.xml, so merging never rehashes the day's history.
+    if note.digest is None:
+        key = f"{note.task}\0{note.timestamp}\0{note.subtask}\0{note.content}"
+        note.digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    return note.digest
+
+
+def dedupe_notes(notes):
+    unique_notes = []
+    seen = set()
+    for note in notes:
+        digest = note_digest(note)
+        if digest not in seen:
+            seen.add(digest)
+            unique_notes.append(note)
+    return unique_notes
+
+
+def is_time_note(note):
+    # Per-minute "Time logged:" notes from before the time ledger; they are not real notes
+    return note.content.startswith(LEGACY_TIME_PREFIX)
+
+
+class SessionScan:
+    # Everything startup needs from a day's notes, gathered in one pass over them
+    def __init__(self, notes, last_shutdown, recent_subtasks):
+        self.notes = notes
+        self.last_shutdown = last_shutdown
+        self.recent_subtasks = recent_subtasks
+
+
+def scan_session(notes, recent_limit=RECENT_SUBTASKS):
+    last_shutdown = None
+    newest_use = {}
+    for note in notes:
+        content = note.content
+        if SHUTDOWN_MARKER in content:
+            last_shutdown = content.split(SHUTDOWN_MARKER, 1)[1]
+        subtask = note.subtask
+        if subtask and newest_use.get(subtask, "") <= note.timestamp:
+            newest_use[subtask] = note.timestamp
+    recent_subtasks = sorted(newest_use, key=newest_use.get, reverse=True)[:recent_limit]
+    return SessionScan(notes, last_shutdown, recent_subtasks)
+
+
+def iter_notes_xml(note_filename_xml):
+    for note in iter_xml(note_filename_xml, "note"):
+        yield Note(note.get("task"), note.get("timestamp"), note.text, note.get("subtask"), note.get("screenshot"),
+                   note.get("h"))
+
+
+def read_notes_xml(note_filename_xml):
+    return list(iter_notes_xml(note_filename_xml))
+
+
+def read_journal(journal_filename):
+    records = []
+    if not os.path.exists(journal_filename):
+        return records
+    with open(journal_filename, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A torn trailing line from a crash mid-append; everything before it is intact
+                logger.error("Skipping unreadable journal record %s:%d", journal_filename, line_no)
+    return records
+
+
+def read_journal_tail(journal_filename, offset=0):
+    # Records appended since byte offset, by this process or any other writing the same day.
+    # Returns the records and the offset to resume from; a torn last line stays unread until complete.
+    try:
+        with open(journal_filename, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < offset:
+                # Rotated or replaced underneath us: start over, the digests filter what we already have
+                offset = 0
+            if size == offset:
+                return [], offset
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            logger.error("Skipping unreadable journal record in %s", journal_filename)
+    return records, offset + end
+
+
+def replay_journal(notes, records):
+    for record in records:
+        if record.get("op") == "screenshot":
+            # Screenshots finish after their note was journaled; patch the newest matching note
+            for note in reversed(notes):
+                if note.task == record.get("task") and note.timestamp == record.get("timestamp"):
+                    note.screenshot = record.get("path", "")
+                    break
+        else:
+            notes.append(Note(record.get("task"), record.get("timestamp"), record.get("content"),
+                              record.get("subtask"), record.get("screenshot"), record.get("h")))
+    return notes
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def _write_atomic(filename, write_fn):
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        write_fn(f)
+    os.replace(tmp_filename, filename)
+
+
+def write_notes_xml(note_filename_xml, date_str, notes):
+    def write(f):
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<notes date="{date_str}">\n')
+        for n in notes:
+            subtask_attr = f' subtask={xml_attr(n.subtask)}' if n.subtask else ""
+            screenshot_attr = f' screenshot={xml_attr(n.screenshot)}' if n.screenshot else ""
+            f.write(f' <note task={xml_attr(n.task)} timestamp={xml_attr(n.timestamp)}{subtask_attr}'
+                    f'{screenshot_attr} h="{note_digest(n)}">{xml_text(n.content)}</note>\n')
+        f.write('</notes>\n')
+    _write_atomic(note_filename_xml, write)
+    logger.info("Updated XML file with %d notes: %s - XML locked, Vault 101 secure!", len(notes), note_filename_xml)
+
+
+def write_notes_html(note_filename_html, date_str, notes, task_colors):
+    def write(f):
+        f.write('<html><head><style>')
+        f.write('body { font-family: Arial, sans-serif; margin: 20px; }')
+        f.write('h2 { color: #666; }')
+        f.write('.note { margin: 5px 0; padding: 10px; border-radius: 4px; }')
+        for task_name, colors in task_colors.items():
+            f.write(f'.note-{task_name} {{ background: {colors["bg"]}; color: {colors["fg"]}; }}')
+        f.write('@media (max-width: 600px) { .note { padding: 8px; font-size: 14px; } }')
+        f.write(f'</style></head><body>\n<h2>Notes for {date_str}</h2>\n')
+        for n in notes:
+            if not is_time_note(n):
+                subtask_str = f" /{xml_text(n.subtask)}" if n.subtask else ""
+                f.write(
+                    f'<div class="note note-{n.task}" data-task="{n.task}"><p><strong>{n.timestamp}</strong> '
+                    f'[{n.task}{subtask_str}]: {xml_text(n.content)}</p></div>\n')
+        f.write('</body></html>\n')
+    _write_atomic(note_filename_html, write)
+    logger.info("Updated HTML file with %d notes: %s - HTML updated, Spider-Man swings in!", len(notes),
+                note_filename_html)
+
+
+class NoteJournal:
+    # notes.xml stays the compacted snapshot; every new note is one JSON line appended to
+    # notes.journal, and compaction folds the journal back into notes.xml. notes.html is rendered
+    # on request or at end of day, never on the save path.
+    def __init__(self, session_dir, date_str, task_colors):
+        self.session_dir = session_dir
+        self.date_str = date_str
+        self.task_colors = task_colors
+        self.xml_path = os.path.join(session_dir, "notes.xml")
+        self.html_path = os.path.join(session_dir, "notes.html")
+        self.path = os.path.join(session_dir, JOURNAL_FILENAME)
+        self.rotated_path = self.path + ".compacting"
+        self.pending = 0
+        self.seen = set()  # digests of every note already in the day, ours or another instance's
+        self.merged = []  # records other writers appended, waiting for take_merged()
+        self._offset = 0  # how far into the live journal we have read
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compact_thread = None
+
+    def load(self):
+        rotated = read_journal(self.rotated_path)
+        with self._lock:
+            live, self._offset = read_journal_tail(self.path)
+        tail = rotated + live
+        self.pending = len(tail)
+        notes = dedupe_notes(replay_journal(read_notes_xml(self.xml_path), tail))
+        self.seen = {note.digest for note in notes}
+        return notes
+
+    def iter_notes(self):
+        # Read-only streaming view for reports: notes.xml is never held in memory. The journal tail is
+        # small, so its screenshot patches are gathered first and applied as the snapshot streams past.
+        tail = read_journal(self.rotated_path) + read_journal(self.path)
+        screenshots = {(r.get("task"), r.get("timestamp")): r.get("path", "") for r in tail
+                       if r.get("op") == "screenshot"}
+        journaled = replay_journal([], [r for r in tail if r.get("op") != "screenshot"])
+        seen = set()
+        for note in itertools.chain(iter_notes_xml(self.xml_path), journaled):
+            digest = note_digest(note)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            note.screenshot = screenshots.get((note.task, note.timestamp), note.screenshot)
+            yield note
+
+    def load_session(self, recent_limit=RECENT_SUBTASKS):
+        return scan_session(self.load(), recent_limit)
+
+    def append(self, note):
+        digest = note_digest(note)
+        record = {"task": note.task, "timestamp": note.timestamp, "subtask": note.subtask, "content": note.content,
+                  "h": digest}
+        if note.screenshot:
+            record["screenshot"] = note.screenshot
+        with self._lock:
+            # Catch up on other writers first so a note they already recorded is not written twice
+            self._pull_tail_locked()
+            if digest in self.seen:
+                # The caller already holds this note, so it must not come back through take_merged()
+                self.merged = [r for r in self.merged if r.get("h") != digest]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Agent X: Note for %s already journaled - Deja vu, Neo!", note.task)
+                return self.pending >= COMPACT_THRESHOLD
+            self._write_record_locked(record)
+            self.seen.add(digest)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Agent X: Journaled note for %s (%d pending) - Captain's log, supplemental!", note.task,
+                         self.pending)
+        return self.pending >= COMPACT_THRESHOLD
+
+    def attach_screenshot(self, note, path):
+        with self._lock:
+            self._write_record_locked({"op": "screenshot", "task": note.task, "timestamp": note.timestamp,
+                                       "path": path})
+        return self.pending >= COMPACT_THRESHOLD
+
+    def _write_record_locked(self, record):
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(data)
+            end = f.tell()
+        if end - len(data) == self._offset:
+            # Nothing else was appended since our last read, so our own line needs no re-reading
+            self._offset = end
+        self.pending += 1
+
+    def _pull_tail_locked(self):
+        # Our own lines come back here too; the digest check drops them. Screenshot records are
+        # passed on as-is, re-applying one we wrote ourselves is harmless.
+        records, self._offset = read_journal_tail(self.path, self._offset)
+        for record in records:
+            if record.get("op") == "screenshot":
+                self.merged.append(record)
+                continue
+            digest = record.get("h")
+            if digest is None:
+                digest = note_digest(replay_journal([], [record])[0])
+            if digest not in self.seen:
+                self.seen.add(digest)
+                self.merged.append(record)
+
+    def has_unread_tail(self):
+        # One stat, no read: False while the live journal holds nothing past what we already read
+        try:
+            return os.stat(self.path).st_size != self._offset
+        except FileNotFoundError:
+            return False
+
+    def pull_tail(self):
+        with self._lock:
+            self._pull_tail_locked()
+
+    def take_merged(self):
+        with self._lock:
+            records, self.merged = self.merged, []
+        return records
+
+    def needs_compaction(self):
+        return self.pending >= COMPACT_THRESHOLD
+
+    def compact(self):
+        with self._compact_lock:
+            # Rotate the live journal out of the way so appends never wait on the rewrite.
+            # A leftover rotated file from an interrupted compaction is folded in first.
+            with self._lock:
+                if os.path.exists(self.path) and not os.path.exists(self.rotated_path):
+                    self._pull_tail_locked()
+                    os.replace(self.path, self.rotated_path)
+                    self._offset = 0
+                self.pending = len(read_journal(self.path))
+            if not os.path.exists(self.rotated_path):
+                return
+            notes = dedupe_notes(replay_journal(read_notes_xml(self.xml_path), read_journal(self.rotated_path)))
+            write_notes_xml(self.xml_path, self.date_str, notes)
+            os.remove(self.rotated_path)
+            logger.debug("Agent X: Journal compacted into %d notes - Trash compactor engaged, Luke!", len(notes))
+
+    def html_is_stale(self):
+        # notes.html is derived: it is only worth rewriting when a source file is newer than it
+        html_mtime = _mtime(self.html_path)
+        return any(_mtime(path) > html_mtime for path in (self.xml_path, self.path, self.rotated_path))
+
+    def render_html(self, force=False):
+        if not force and not self.html_is_stale():
+            return False
+        write_notes_html(self.html_path, self.date_str, list(self.iter_notes()), self.task_colors)
+        return True
+
+    def compact_async(self):
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(target=self._compact_safely, name="NoteJournalCompactor",
+                                                daemon=True)
+        self._compact_thread.start()
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except OSError as e:
+            logger.error("Journal compaction failed: %s - Compactor jammed!", str(e))
+
+    def wait(self):
+        if self._compact_thread is not None:
+            self._compact_thread.join()
@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger("AgentX")
+
+LEDGER_FILENAME = "time.ledger"
+LEGACY_TIME_PREFIX = "Time logged:"
+# Each running instance checkpoints its open span to its own time.ledger.open.<host>.<pid>; a bare
+# time.ledger.open was written by versions that assumed one instance per day
+CHECKPOINT_PREFIX = LEDGER_FILENAME + ".open"
+HOSTNAME = socket.gethostname()
+# A checkpoint whose owner cannot be checked directly counts as abandoned once it is this stale
+STALE_CHECKPOINT_S = 300
+
+
+# A span is a plain (task, subtask, start, end) tuple with epoch-second bounds. The ledger file holds
+# one closed span per line as a JSON array; the span still running is checkpointed to a per-instance
+# side file so a crash loses at most one checkpoint interval.
+
+def read_ledger(ledger_filename):
+    spans = []
+    if not os.path.exists(ledger_filename):
+        return spans
+    with open(ledger_filename, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                task, subtask, start, end = json.loads(line)
+                spans.append((sys.intern(task), sys.intern(subtask), float(start), float(end)))
+            except (ValueError, TypeError):
+                # Same torn-line tolerance as the note journal
+                logger.error("Skipping unreadable ledger span %s:%d", ledger_filename, line_no)
+    return spans
+
+
+def read_checkpoint(checkpoint_filename):
+    if not os.path.exists(checkpoint_filename):
+        return None
+    try:
+        with open(checkpoint_filename, "r", encoding="utf-8") as f:
+            task, subtask, start, end = json.load(f)
+        return task, subtask, float(start), float(end)
+    except (OSError, ValueError, TypeError):
+        logger.error("Failed to read open span checkpoint %s", checkpoint_filename)
+        return None
+
+
+def checkpoint_filename(session_dir, host=HOSTNAME, pid=None):
+    return os.path.join(session_dir, f"{CHECKPOINT_PREFIX}.{host}.{os.getpid() if pid is None else pid}")
+
+
+def list_checkpoints(session_dir):
+    # [(path, (host, pid) or None for a legacy checkpoint)] of every instance's open-span checkpoint
+    found = []
+    try:
+        with os.scandir(session_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.startswith(CHECKPOINT_PREFIX) or name.endswith((".tmp", ".adopting")):
+                    continue
+                owner = None
+                if name != CHECKPOINT_PREFIX:
+                    host, _, pid = name[len(CHECKPOINT_PREFIX) + 1:].rpartition(".")
+                    if not pid.isdigit():
+                        continue
+                    owner = (host, int(pid))
+                found.append((entry.path, owner))
+    except OSError:
+        pass
+    return found
+
+
+def _owner_alive(owner, last_checkpoint, now, stale_after):
+    if owner is not None and owner[0] == HOSTNAME:
+        if owner[1] == os.getpid():
+            return False  # a previous process that had our pid; we have not checkpointed yet
+        if os.name == "posix":
+            try:
+                os.kill(owner[1], 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                return True
+            return True
+    # Another machine, or no cheap process check: a live owner rewrites its checkpoint every flush
+    return now - last_checkpoint < stale_after
+
+
+def legacy_spans(date_str, notes):
+    # Days recorded before the ledger only carry "Time logged: N minutes" notes. Each one closed a
+    # span at its own timestamp, so the span can be rebuilt exactly from the two numbers.
+    spans = []
+    for note in notes:
+        content = note.content
+        if not content.startswith(LEGACY_TIME_PREFIX):
+            continue
+        try:
+            minutes = float(content.split(" ")[2])
+            end = datetime.strptime(f"{date_str} {note.timestamp}", "%Y-%m-%d %H:%M:%S").timestamp()
+        except (IndexError, ValueError):
+            logger.error("Failed to parse time from note: %s - Time travel glitch detected!", content)
+            continue
+        spans.append((note.task, note.subtask, end - minutes * 60.0, end))
+    return spans
+
+
+def day_spans(session_dir, date_str, notes):
+    # Read-only view of a day for reports and the index: ledger, a crashed session's open span, and legacy notes
+    spans = read_ledger(os.path.join(session_dir, LEDGER_FILENAME))
+    for path, _ in list_checkpoints(session_dir):
+        checkpoint = read_checkpoint(path)
+        if checkpoint is not None and all(span[2] != checkpoint[2] for span in spans):
+            spans.append(checkpoint)
+    return spans + legacy_spans(date_str, notes)
+
+
+def span_totals(spans, since=None, until=None, by_subtask=False):
+    # Minutes per task (or per (task, subtask)), optionally clipped to [since, until)
+    totals = {}
+    for task, subtask, start, end in spans:
+        if since is not None and start < since:
+            start = since
+        if until is not None and end > until:
+            end = until
+        if end <= start:
+            continue
+        key = (task, subtask) if by_subtask else task
+        totals[key] = totals.get(key, 0.0) + (end - start) / 60.0
+    return totals
+
+
+class TimeLedger:
+    # Time tracking for the running session. Spans are opened and closed on the UI thread; the
+    # write_* methods do the file work and are meant to run on the write queue.
+    def __init__(self, session_dir, stale_after=STALE_CHECKPOINT_S):
+        self.session_dir = session_dir
+        self.path = os.path.join(session_dir, LEDGER_FILENAME)
+        self.checkpoint_path = checkpoint_filename(session_dir)
+        self.stale_after = stale_after
+        self.spans = []
+        self.current = None  # (task, subtask, start) of the running span
+        self._lock = threading.Lock()
+
+    def load(self, date_str, notes, now=None):
+        spans = read_ledger(self.path)
+        for checkpoint in self._adopt_abandoned(now if now is not None else time.time()):
+            if all(span[2] != checkpoint[2] for span in spans):
+                # That session died with a span open; keep it up to its final checkpoint
+                self.write_span(checkpoint)
+                spans.append(checkpoint)
+        self.spans = spans + legacy_spans(date_str, notes)
+        logger.info("Loaded %d time spans from %s", len(self.spans), self.path)
+        return self.spans
+
+    def _adopt_abandoned(self, now):
+        # Only checkpoints whose instance is gone: another instance still running closes its own span.
+        # Renaming claims a checkpoint, so two instances starting together never both adopt it.
+        adopted = []
+        for path, owner in list_checkpoints(self.session_dir):
+            checkpoint = read_checkpoint(path)
+            if checkpoint is None or _owner_alive(owner, checkpoint[3], now, self.stale_after):
+                continue
+            claimed = f"{path}.{os.getpid()}.adopting"
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            adopted.append(checkpoint)
+            os.remove(claimed)
+        return adopted
+
+    def start(self, task, subtask, now):
+        self.current = (task, subtask, now)
+
+    def close(self, now, task=None, subtask=None):
+        # Closes the running span, optionally crediting it to a different task/subtask than it was opened with
+        if self.current is None:
+            return None
+        open_task, open_subtask, start = self.current
+        self.current = None
+        # Compared after rounding: an interval shorter than the ledger's resolution records nothing
+        start, end = round(start, 1), round(now, 1)
+        if end <= start:
+            return None
+        span = (task if task is not None else open_task, subtask if subtask is not None else open_subtask,
+                start, end)
+        self.spans.append(span)
+        return span
+
+    def switch(self, task, subtask, now, credit_task=None, credit_subtask=None):
+        span = self.close(now, credit_task, credit_subtask)
+        self.start(task, subtask, now)
+        return span
+
+    def add(self, span):
+        self.spans.append(span)
+        return span
+
+    def bridge_gap(self, since, now, task="default"):
+        # Credits the time between since (the last shutdown) and now to task, minus whatever the
+        # ledger already covers: spans written after that shutdown, or adopted from a crashed session
+        start = round(max([since] + [span[3] for span in self.spans]), 1)
+        end = round(now, 1)
+        if end <= start:
+            return None
+        return self.add((task, "", start, end))
+
+    def open_span(self, now):
+        if self.current is None:
+            return None
+        task, subtask, start = self.current
+        start, end = round(start, 1), round(now, 1)
+        if end <= start:
+            return None
+        return task, subtask, start, end
+
+    def totals(self, now=None, by_subtask=False):
+        spans = self.spans
+        running = self.open_span(now) if now is not None else None
+        if running is not None:
+            spans = spans + [running]
+        return span_totals(spans, by_subtask=by_subtask)
+
+    def write_span(self, span):
+        line = json.dumps(list(span), ensure_ascii=False)
+        with self._lock:
+            os.makedirs(self.session_dir, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            # The closed span supersedes whatever checkpoint was written for it
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+
+    def write_checkpoint(self, span):
+        tmp_filename = self.checkpoint_path + ".tmp"
+        with self._lock:
+            with open(tmp_filename, "w", encoding="utf-8") as f:
+                json.dump(list(span), f, ensure_ascii=False)
+            os.replace(tmp_filename, self.checkpoint_path)
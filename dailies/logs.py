@@ -0,0 +1,41 @@
+import os
+import sys
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+
+def setup_logging(level="INFO", path="", max_bytes=2_000_000, backups=3, console=True):
+    # Callers only pay for putting a record on a queue; formatting and the file/stderr writes happen
+    # on the listener's thread. Returns the listener, which must be stopped at exit to flush the tail.
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8",
+                                               delay=True)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"Cannot log to {path}: {e}", file=sys.stderr)
+    if console or not handlers:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
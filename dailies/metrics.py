@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import logging
+import threading
+import functools
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+logger = logging.getLogger("AgentX")
+
+# Samples kept per operation; percentiles describe the recent past, count/total/worst the whole run
+WINDOW = 512
+_DISABLED = nullcontext()
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Histogram:
+    __slots__ = ("samples", "count", "total", "worst")
+
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.worst:
+            self.worst = seconds
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {"count": self.count, "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+                "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3), "max_ms": round(self.worst * 1000, 3),
+                "total_ms": round(self.total * 1000, 1)}
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    # Per-operation latency histograms, safe to feed from any thread. Off by default: timed() then
+    # hands back one shared no-op context manager and record() returns straight away, so
+    # instrumented code pays an attribute check and nothing else.
+    def __init__(self, enabled=False, window=WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def timed(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, name)
+
+    def measure(self, name):
+        # Decorator form of timed() for functions that are one operation start to finish
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Timer(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.window)
+            histogram.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def report(self):
+        lines = ["Operation latencies:"]
+        for name, s in self.snapshot().items():
+            lines.append(f"  {name:<24} n={s['count']:<6} p50={s['p50_ms']:.1f} ms p95={s['p95_ms']:.1f} ms "
+                         f"max={s['max_ms']:.1f} ms")
+        return "\n".join(lines)
+
+    def dump(self, path, extra=None):
+        record = {"when": datetime.now().isoformat(timespec="seconds"), "operations": self.snapshot()}
+        if extra:
+            record.update(extra)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp, path)
+        logger.info("Metrics written to %s", path)
+
+
+# Process-wide instance; the app switches it on from config, headless runs leave it off
+METRICS = Metrics()
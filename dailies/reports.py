@@ -0,0 +1,553 @@
+import io
+import os
+import json
+import hashlib
+import logging
+from datetime import timedelta
+from itertools import repeat
+
+from dailies.journal import NoteJournal, is_time_note
+from dailies.ledger import CHECKPOINT_PREFIX, day_spans, span_totals
+from dailies.metrics import METRICS
+from dailies.storage import iter_events_xml, iter_shifts_xml, read_events_xml, read_shifts_xml, xml_attr, xml_text
+from dailies.tasks import TASK_COLORS, TASKS
+
+logger = logging.getLogger("AgentX")
+
+# Below this many days the process pool costs more to start than it saves
+PARALLEL_THRESHOLD = 8
+REPORTS_DIRNAME = "reports"
+# Files whose mtime/size decide whether a day's report is still current; task subdirectories
+# (screenshots) are fingerprinted alongside them
+SOURCE_FILES = ("notes.xml", "notes.journal", "notes.journal.compacting", "time.ledger",
+                "shifts.xml", "events.xml")
+
+
+def format_minutes(minutes):
+    hours = int(minutes // 60)
+    mins = int(minutes % 60)
+    return f"{hours}h {mins}m"
+
+
+def week_range(day):
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=6)
+
+
+def month_range(day):
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def dates_between(start, end):
+    day = start
+    while day <= end:
+        yield day.strftime("%Y-%m-%d")
+        day += timedelta(days=1)
+
+
+def parse_day(base_dir, date_str):
+    # Runs in a worker process, so it returns small picklable aggregates rather than every note
+    session_dir = os.path.join(base_dir, date_str)
+    # One streaming pass over each file; only the aggregates are kept
+    note_count = 0
+    time_notes = []
+    subtasks = {}
+    afk = False
+    for note in NoteJournal(session_dir, date_str, {}).iter_notes():
+        if is_time_note(note):
+            time_notes.append(note)
+            continue
+        note_count += 1
+        if note.subtask:
+            key = (note.task, note.subtask)
+            subtasks[key] = subtasks.get(key, 0) + 1
+        if note.task == "default" and "auto-note" in note.content:
+            afk = True
+    total_worked = total_lunches = 0.0
+    shift_count = 0
+    for shift in iter_shifts_xml(os.path.join(session_dir, "shifts.xml")):
+        shift_count += 1
+        if shift["type"] == "work_out":
+            total_worked += shift["worked"]
+        elif shift["type"] == "lunch_in":
+            total_lunches += shift["duration"]
+    return {
+        "date": date_str,
+        "note_count": note_count,
+        "task_times": span_totals(day_spans(session_dir, date_str, time_notes)),
+        "subtasks": subtasks,
+        "afk": afk,
+        "total_worked": total_worked,
+        "total_lunches": total_lunches,
+        "shift_count": shift_count,
+        "events": list(iter_events_xml(os.path.join(session_dir, "events.xml"))),
+    }
+
+
+def load_day(base_dir, report_date, task_names=TASK_COLORS.keys()):
+    # Everything a single-day report needs, or None when the day has no notes
+    session_dir = os.path.join(base_dir, report_date)
+    journal = NoteJournal(session_dir, report_date, {})
+    if not os.path.exists(journal.xml_path) and not os.path.exists(journal.path):
+        return None
+    notes = list(journal.iter_notes())
+    task_times = {task: 0.0 for task in task_names}
+    for task, minutes in span_totals(day_spans(session_dir, report_date, notes)).items():
+        task_times[task] = task_times.get(task, 0.0) + minutes
+    shifts = read_shifts_xml(os.path.join(session_dir, "shifts.xml"))
+    total_lunches = sum(s["duration"] for s in shifts if s["type"] == "lunch_in")
+    events = read_events_xml(os.path.join(session_dir, "events.xml"))
+    logger.info("Loaded %d notes for past report on %s", len(notes), report_date)
+    return notes, task_times, shifts, total_lunches, events
+
+
+def collect_range(base_dir, start, end, max_workers=None):
+    dates = [d for d in dates_between(start, end) if os.path.isdir(os.path.join(base_dir, d))]
+    if len(dates) < PARALLEL_THRESHOLD:
+        return [parse_day(base_dir, d) for d in dates]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        days = list(pool.map(parse_day, repeat(base_dir), dates, chunksize=max(1, len(dates) // 32)))
+    logger.info("Parsed %d session directories in parallel for %s..%s", len(days), start, end)
+    return days
+
+
+def aggregate_days(days, task_names):
+    task_times = {task: 0.0 for task in task_names}
+    subtasks = {}
+    productive = afk = worked = lunches = 0.0
+    note_count = 0
+    for day in days:
+        for task, minutes in day["task_times"].items():
+            task_times[task] = task_times.get(task, 0.0) + minutes
+            if task == "default" and day["afk"]:
+                afk += minutes
+            else:
+                productive += minutes
+        for key, count in day["subtasks"].items():
+            subtasks[key] = subtasks.get(key, 0) + count
+        worked += day["total_worked"]
+        lunches += day["total_lunches"]
+        note_count += day["note_count"]
+    return {
+        "days": days,
+        "task_times": task_times,
+        "subtasks": subtasks,
+        "productive": productive,
+        "afk": afk,
+        "worked": worked,
+        "lunches": lunches,
+        "note_count": note_count,
+    }
+
+
+def write_time_chart(report, task_colors, task_times):
+    tasks = list(task_colors.keys())
+    report.write('<canvas id="timeChart"></canvas>\n')
+    report.write('<script>\n')
+    report.write('const ctx = document.getElementById("timeChart").getContext("2d");\n')
+    report.write('const timeChart = new Chart(ctx, {\n')
+    report.write(' type: "pie",\n')
+    report.write(' data: {\n')
+    report.write(' labels: [' + ', '.join(f'"{task.capitalize()}"' for task in tasks) + '],\n')
+    report.write(' datasets: [{\n')
+    report.write(' data: [' + ', '.join(f'{task_times.get(task, 0.0):.1f}' for task in tasks) + '],\n')
+    report.write(' backgroundColor: [' + ', '.join(f'"{task_colors[task]["bg"]}"' for task in tasks) + '],\n')
+    report.write(' borderColor: "#fff",\n')
+    report.write(' borderWidth: 2\n')
+    report.write(' }]\n')
+    report.write(' },\n')
+    report.write(' options: {\n')
+    report.write(' responsive: true,\n')
+    report.write(' plugins: {\n')
+    report.write(' legend: { position: "top" },\n')
+    report.write(' tooltip: {\n')
+    report.write(' callbacks: {\n')
+    report.write(' label: function(context) {\n')
+    report.write(' let label = context.label || "";\n')
+    report.write(' if (label) label += ": ";\n')
+    report.write(' label += context.raw + " minutes";\n')
+    report.write(' return label;\n')
+    report.write(' }\n')
+    report.write(' }\n')
+    report.write(' }\n')
+    report.write(' }\n')
+    report.write(' }\n')
+    report.write('});\n')
+    report.write('</script>\n')
+
+
+def _render_task_html(task, task_notes, task_time, session_dir):
+    report = io.StringIO()
+    report.write(f'<div class="task-group">\n<h3>{task.upper()}</h3>\n<ul>\n')
+    for note in task_notes:
+        subtask_str = f" /{note.subtask}" if note.subtask else ""
+        report.write(
+            f'<li><div class="note note-{task}"><strong>{note.timestamp}</strong> [{task}{subtask_str}]: {note.content}</div></li>\n')
+    report.write(f'</ul>\n<p>Tracked Time: {task_time:.1f} minutes</p>\n')
+    screenshots = _list_screenshots(session_dir, task)
+    if screenshots:
+        report.write('<p>Screenshots:</p>\n<ul>\n')
+        for shot in screenshots:
+            report.write(f'<li><a href="{task}/{shot}">{shot}</a></li>\n')
+        report.write('</ul>\n')
+    report.write('</div>\n')
+    return report.getvalue()
+
+
+def _render_task_xml(task, task_notes, task_time, session_dir):
+    report = io.StringIO()
+    report.write(f' <task name="{task}">\n')
+    for note in task_notes:
+        subtask_attr = f' subtask="{note.subtask}"' if note.subtask else ""
+        report.write(f' <note task="{task}" timestamp="{note.timestamp}"{subtask_attr}>{note.content}</note>\n')
+    report.write(f' <time>{task_time:.1f}</time>\n')
+    screenshots = _list_screenshots(session_dir, task)
+    if screenshots:
+        report.write(' <screenshots>\n')
+        for shot in screenshots:
+            report.write(f' <screenshot>{shot}</screenshot>\n')
+        report.write(' </screenshots>\n')
+    report.write(' </task>\n')
+    return report.getvalue()
+
+
+def _list_screenshots(session_dir, task):
+    # Runs for every task of every rendered day, so the debug lines are skipped outright below DEBUG
+    debug = logger.isEnabledFor(logging.DEBUG)
+    task_dir = os.path.join(session_dir, task)
+    if not os.path.exists(task_dir):
+        if debug:
+            logger.debug("Agent X: No directory for %s - This task is a ghost, Scooby-Doo!", task)
+        return []
+    prefix = f"screenshot_{task}"
+    screenshots = [f for f in os.listdir(task_dir) if f.startswith(prefix)]
+    if debug:
+        if screenshots:
+            logger.debug("Agent X: Found %d screenshots for %s - Say cheese, Shutterbug!", len(screenshots), task)
+        else:
+            logger.debug("Agent X: No screenshots for %s - The camera shy task strikes again!", task)
+    return screenshots
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def source_fingerprint(session_dir, task_colors, tasks):
+    # One scandir of the day directory: every input file and task folder with its mtime and size,
+    # plus the render settings. Equal fingerprints mean the last report on disk is still current.
+    entries = []
+    try:
+        with os.scandir(session_dir) as it:
+            for entry in it:
+                if entry.name in SOURCE_FILES or entry.name.startswith(CHECKPOINT_PREFIX) or entry.is_dir():
+                    st = entry.stat()
+                    entries.append([entry.name, st.st_mtime_ns, st.st_size])
+    except OSError:
+        return None
+    entries.sort()
+    return hashlib.blake2b(json.dumps([entries, task_colors, list(tasks)], sort_keys=True).encode("utf-8"),
+                           digest_size=16).hexdigest()
+
+
+def _section_key(task, task_notes, task_time, session_dir):
+    # A task section only changes when its notes, its tracked time (as displayed) or its screenshot folder do
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{task}\0{task_time:.1f}\0{_dir_mtime(os.path.join(session_dir, task))}".encode("utf-8"))
+    for note in task_notes:
+        digest.update(f"\0{note.timestamp}\0{note.subtask}\0{note.content}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cache_path(session_dir, report_date):
+    return os.path.join(session_dir, f"report_{report_date}.cache.json")
+
+
+def _read_cache(session_dir, report_date):
+    try:
+        with open(_cache_path(session_dir, report_date), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(session_dir, report_date, cache):
+    cache_filename = _cache_path(session_dir, report_date)
+    tmp_filename = cache_filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_filename, cache_filename)
+
+
+def _render_sections(report_date, notes, task_times, session_dir, tasks, cached_sections):
+    # Task sections in report order, reusing cached HTML/XML for any section whose inputs are unchanged
+    sections = {}
+    total_time = 0
+    afk_time = 0
+    reused = 0
+    for task in list(tasks) + ["default"]:
+        task_notes = [n for n in notes if n.task == task and not is_time_note(n)]
+        if not task_notes:
+            continue
+        task_time = task_times.get(task, 0.0)
+        if task == "default" and any("auto-note" in n.content for n in task_notes):
+            afk_time += task_time
+        else:
+            total_time += task_time
+        key = _section_key(task, task_notes, task_time, session_dir)
+        cached = cached_sections.get(task)
+        if cached is not None and cached.get("key") == key:
+            sections[task] = cached
+            reused += 1
+        else:
+            sections[task] = {"key": key, "html": _render_task_html(task, task_notes, task_time, session_dir),
+                              "xml": _render_task_xml(task, task_notes, task_time, session_dir)}
+    logger.debug("Report %s: reused %d of %d task sections", report_date, reused, len(sections))
+    return sections, total_time, afk_time
+
+
+def _write_html_report(report, report_date, sections, total_time, afk_time, events):
+    report.write(f'<h2>Date: {report_date}</h2>\n')
+    for section in sections.values():
+        report.write(section["html"])
+
+    report.write('<table class="summary">\n')
+    report.write('<tr><th>Metric</th><th>Value</th></tr>\n')
+    report.write(f'<tr><td>Total Productive Time</td><td>{total_time:.1f} minutes</td></tr>\n')
+    report.write(f'<tr><td>Total AFK Time</td><td>{afk_time:.1f} minutes</td></tr>\n')
+    report.write(f'<tr><td>Grand Total Time</td><td>{total_time + afk_time:.1f} minutes</td></tr>\n')
+    report.write('</table>\n')
+
+    if events:
+        report.write('<h2>Events</h2>\n<ul>\n')
+        for event in events:
+            status = "Completed" if event['complete'] else "Pending"
+            color = event.get('color', '#FFFFFF')
+            report.write(f'<li style="background-color: {color}; padding: 5px;">{event["text"]} ({status})</li>\n')
+        report.write('</ul>\n')
+
+
+def _write_xml_report(report, sections, total_time, afk_time, events):
+    for section in sections.values():
+        report.write(section["xml"])
+
+    if events:
+        report.write(' <events>\n')
+        for event in events:
+            report.write(f' <event complete="{str(event["complete"]).lower()}" color="{event.get("color", "#FFFFFF")}">{event["text"]}</event>\n')
+        report.write(' </events>\n')
+
+    report.write(f' <totals>\n')
+    report.write(f' <productive>{total_time:.1f}</productive>\n')
+    report.write(f' <afk>{afk_time:.1f}</afk>\n')
+    report.write(f' <grand>{total_time + afk_time:.1f}</grand>\n')
+    report.write(f' </totals>\n')
+
+
+@METRICS.measure("report_day_write")
+def write_day_report(session_dir, report_date, notes, task_times, shifts, total_lunches, events,
+                     task_colors=TASK_COLORS, tasks=TASKS, source=None):
+    # source is the fingerprint of the files the inputs were read from, if they were read from files;
+    # live sessions pass None so their in-memory state is never mistaken for what is on disk
+    cache = _read_cache(session_dir, report_date)
+    sections, total_time, afk_time = _render_sections(report_date, notes, task_times, session_dir, tasks,
+                                                      cache.get("sections", {}))
+    report_filename_html = os.path.join(session_dir, f"report_{report_date}.html")
+    with open(report_filename_html, "w", encoding="utf-8") as report:
+        report.write('<!DOCTYPE html>\n<html><head>')
+        report.write('<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>')
+        report.write('<style>')
+        report.write('body { font-family: Arial, sans-serif; margin: 20px; background: #f9f9f9; }')
+        report.write('h1 { color: #2c3e50; } h2 { color: #34495e; } h3 { color: #7f8c8d; }')
+        report.write('.note { margin: 5px 0; padding: 10px; border-radius: 4px; }')
+        for task_name, colors in task_colors.items():
+            report.write(f'.note-{task_name} {{ background: {colors["bg"]}; color: {colors["fg"]}; }}')
+        report.write('.task-group { margin-bottom: 25px; padding: 10px; background: #ecf0f1; border-radius: 8px; }')
+        report.write('.summary { border-collapse: collapse; width: 50%; margin-top: 20px; }')
+        report.write('.summary td, .summary th { border: 1px solid #ddd; padding: 8px; text-align: left; }')
+        report.write('.summary th { background: #3498db; color: white; }')
+        report.write('#timeChart { max-width: 500px; margin: 20px auto; }')
+        report.write('@media (max-width: 600px) { .note { padding: 8px; font-size: 14px; } }')
+        report.write('</style></head><body>\n<h1>Daily Report</h1>\n')
+        _write_html_report(report, report_date, sections, total_time, afk_time, events)
+        report.write('<h2>Time Breakdown</h2>\n')
+        write_time_chart(report, task_colors, task_times)
+
+        # Add shift summary
+        report.write('<h2>Shift Summary</h2>\n')
+        report.write('<table class="summary">\n')
+        report.write('<tr><th>Metric</th><th>Value</th></tr>\n')
+        total_worked = sum(s.get("worked", 0) for s in shifts if s["type"] == "work_out")
+        report.write(f'<tr><td>Total Worked</td><td>{format_minutes(total_worked)}</td></tr>\n')
+        report.write(f'<tr><td>Total Lunch Time</td><td>{format_minutes(total_lunches)}</td></tr>\n')
+        report.write('</table>\n')
+
+        report.write('</body></html>\n')
+    logger.info("Generated HTML report with pie chart: %s - Report beamed up, Scotty!", report_filename_html)
+
+    report_filename_xml = os.path.join(session_dir, f"report_{report_date}.xml")
+    with open(report_filename_xml, "w", encoding="utf-8") as report:
+        report.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<report date="{report_date}">\n')
+        _write_xml_report(report, sections, total_time, afk_time, events)
+        report.write('</report>\n')
+    logger.info("Generated XML report: %s - XML dispatched, Agent 007!", report_filename_xml)
+    try:
+        _write_cache(session_dir, report_date, {"source": source, "sections": sections})
+    except OSError as e:
+        logger.error("Failed to write report cache for %s: %s", report_date, str(e))
+    return report_filename_html
+
+
+def _write_range_html(report, start_str, end_str, summary, task_colors):
+    report.write('<!DOCTYPE html>\n<html><head>')
+    report.write('<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>')
+    report.write('<style>')
+    report.write('body { font-family: Arial, sans-serif; margin: 20px; background: #f9f9f9; }')
+    report.write('h1 { color: #2c3e50; } h2 { color: #34495e; } h3 { color: #7f8c8d; }')
+    report.write('.summary { border-collapse: collapse; width: 50%; margin-top: 20px; }')
+    report.write('.summary td, .summary th { border: 1px solid #ddd; padding: 8px; text-align: left; }')
+    report.write('.summary th { background: #3498db; color: white; }')
+    for task_name, colors in task_colors.items():
+        report.write(f'.task-{task_name} {{ background: {colors["bg"]}; color: {colors["fg"]}; }}')
+    report.write('#timeChart { max-width: 500px; margin: 20px auto; }')
+    report.write('</style></head><body>\n')
+    report.write(f'<h1>Report {start_str} to {end_str}</h1>\n')
+
+    report.write('<h2>Totals</h2>\n<table class="summary">\n<tr><th>Metric</th><th>Value</th></tr>\n')
+    report.write(f'<tr><td>Days With Sessions</td><td>{len(summary["days"])}</td></tr>\n')
+    report.write(f'<tr><td>Notes</td><td>{summary["note_count"]}</td></tr>\n')
+    report.write(f'<tr><td>Total Productive Time</td><td>{format_minutes(summary["productive"])}</td></tr>\n')
+    report.write(f'<tr><td>Total AFK Time</td><td>{format_minutes(summary["afk"])}</td></tr>\n')
+    report.write(f'<tr><td>Total Worked</td><td>{format_minutes(summary["worked"])}</td></tr>\n')
+    report.write(f'<tr><td>Total Lunch Time</td><td>{format_minutes(summary["lunches"])}</td></tr>\n')
+    report.write('</table>\n')
+
+    report.write('<h2>Time Breakdown</h2>\n')
+    report.write('<table class="summary">\n<tr><th>Task</th><th>Tracked Time</th></tr>\n')
+    for task, minutes in summary["task_times"].items():
+        report.write(f'<tr class="task-{task}"><td>{xml_text(task)}</td><td>{minutes:.1f} minutes</td></tr>\n')
+    report.write('</table>\n')
+    write_time_chart(report, task_colors, summary["task_times"])
+
+    if summary["subtasks"]:
+        report.write('<h2>Subtasks</h2>\n')
+        report.write('<table class="summary">\n<tr><th>Task</th><th>Subtask</th><th>Notes</th></tr>\n')
+        for (task, subtask), count in sorted(summary["subtasks"].items(), key=lambda item: -item[1]):
+            report.write(f'<tr><td>{xml_text(task)}</td><td>{xml_text(subtask)}</td><td>{count}</td></tr>\n')
+        report.write('</table>\n')
+
+    report.write('<h2>Days</h2>\n')
+    report.write('<table class="summary">\n<tr><th>Date</th><th>Tracked</th><th>Worked</th><th>Lunch</th>'
+                 '<th>Notes</th></tr>\n')
+    for day in summary["days"]:
+        tracked = sum(day["task_times"].values())
+        report.write(f'<tr><td><a href="../{day["date"]}/report_{day["date"]}.html">{day["date"]}</a></td>'
+                     f'<td>{format_minutes(tracked)}</td><td>{format_minutes(day["total_worked"])}</td>'
+                     f'<td>{format_minutes(day["total_lunches"])}</td><td>{day["note_count"]}</td></tr>\n')
+    report.write('</table>\n')
+
+    if any(day["events"] for day in summary["days"]):
+        report.write('<h2>Events</h2>\n<ul>\n')
+        for day in summary["days"]:
+            for event in day["events"]:
+                status = "Completed" if event['complete'] else "Pending"
+                color = event.get('color', '#FFFFFF')
+                report.write(f'<li style="background-color: {color}; padding: 5px;">{day["date"]}: '
+                             f'{xml_text(event["text"])} ({status})</li>\n')
+        report.write('</ul>\n')
+    report.write('</body></html>\n')
+
+
+def _write_range_xml(report, start_str, end_str, summary):
+    report.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<report from="{start_str}" to="{end_str}">\n')
+    for task, minutes in summary["task_times"].items():
+        report.write(f' <task name={xml_attr(task)}><time>{minutes:.1f}</time></task>\n')
+    for (task, subtask), count in summary["subtasks"].items():
+        report.write(f' <subtask task={xml_attr(task)} name={xml_attr(subtask)} notes="{count}"/>\n')
+    for day in summary["days"]:
+        report.write(f' <day date="{day["date"]}" tracked="{sum(day["task_times"].values()):.1f}" '
+                     f'worked="{day["total_worked"]:.1f}" lunch="{day["total_lunches"]:.1f}" notes="{day["note_count"]}">\n')
+        for event in day["events"]:
+            report.write(f'  <event complete="{str(event["complete"]).lower()}" '
+                         f'color={xml_attr(event.get("color", "#FFFFFF"))}>{xml_text(event["text"])}</event>\n')
+        report.write(' </day>\n')
+    report.write(' <totals>\n')
+    report.write(f' <productive>{summary["productive"]:.1f}</productive>\n')
+    report.write(f' <afk>{summary["afk"]:.1f}</afk>\n')
+    report.write(f' <grand>{summary["productive"] + summary["afk"]:.1f}</grand>\n')
+    report.write(f' <worked>{summary["worked"]:.1f}</worked>\n')
+    report.write(f' <lunch>{summary["lunches"]:.1f}</lunch>\n')
+    report.write(' </totals>\n')
+    report.write('</report>\n')
+
+
+@METRICS.measure("report_day")
+def generate_day_report(base_dir, report_date, task_colors=TASK_COLORS, tasks=TASKS):
+    session_dir = os.path.join(base_dir, report_date)
+    source = source_fingerprint(session_dir, task_colors, tasks)
+    report_filename_html = os.path.join(session_dir, f"report_{report_date}.html")
+    if (source is not None and _read_cache(session_dir, report_date).get("source") == source
+            and os.path.exists(report_filename_html)
+            and os.path.exists(os.path.join(session_dir, f"report_{report_date}.xml"))):
+        logger.info("Report for %s is current, nothing to regenerate", report_date)
+        return report_filename_html
+    day = load_day(base_dir, report_date, task_colors.keys())
+    if day is None:
+        return None
+    notes, task_times, shifts, total_lunches, events = day
+    return write_day_report(session_dir, report_date, notes, task_times, shifts, total_lunches, events,
+                            task_colors, tasks, source)
+
+
+def finish_day_notes(base_dir, report_date, task_colors=TASK_COLORS):
+    # Close-of-day work moved off the GUI's shutdown path, done whatever the report policy: fold the
+    # journal into notes.xml and refresh notes.html if it fell behind
+    journal = NoteJournal(os.path.join(base_dir, report_date), report_date, task_colors)
+    try:
+        journal.compact()
+    except OSError as e:
+        logger.error("Journal compaction for %s failed: %s - Reporting from the journal instead", report_date, str(e))
+    try:
+        journal.render_html()
+    except OSError as e:
+        logger.error("Failed to render notes.html for %s: %s", report_date, str(e))
+
+
+def finish_day_report(base_dir, report_date, task_colors=TASK_COLORS, tasks=TASKS):
+    finish_day_notes(base_dir, report_date, task_colors)
+    return generate_day_report(base_dir, report_date, task_colors, tasks)
+
+
+def generate_day_reports(base_dir, start, end, task_colors=TASK_COLORS, tasks=TASKS, max_workers=None):
+    dates = [d for d in dates_between(start, end) if os.path.isdir(os.path.join(base_dir, d))]
+    if len(dates) < PARALLEL_THRESHOLD:
+        paths = [generate_day_report(base_dir, d, task_colors, tasks) for d in dates]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            paths = list(pool.map(generate_day_report, repeat(base_dir), dates, repeat(task_colors), repeat(tasks),
+                                  chunksize=max(1, len(dates) // 32)))
+    return [path for path in paths if path]
+
+
+@METRICS.measure("report_range")
+def generate_range_report(base_dir, start, end, task_colors=TASK_COLORS, max_workers=None):
+    start_str, end_str = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    summary = aggregate_days(collect_range(base_dir, start, end, max_workers), task_colors.keys())
+    out_dir = os.path.join(base_dir, REPORTS_DIRNAME)
+    os.makedirs(out_dir, exist_ok=True)
+    report_filename_html = os.path.join(out_dir, f"report_{start_str}_to_{end_str}.html")
+    with open(report_filename_html, "w", encoding="utf-8") as report:
+        _write_range_html(report, start_str, end_str, summary, task_colors)
+    report_filename_xml = os.path.join(out_dir, f"report_{start_str}_to_{end_str}.xml")
+    with open(report_filename_xml, "w", encoding="utf-8") as report:
+        _write_range_xml(report, start_str, end_str, summary)
+    logger.info("Generated range report over %d days: %s - The long game, Littlefinger!", len(summary["days"]),
+                report_filename_html)
+    return report_filename_html
@@ -0,0 +1,80 @@
+import time
+import logging
+
+logger = logging.getLogger("AgentX")
+
+# Jobs due this close to a tick run in it instead of waking the app up again a moment later
+COALESCE_SLACK = 2.0
+
+
+class Job:
+    __slots__ = ("name", "interval", "fn", "enabled", "next_due", "runs", "skips", "total", "worst")
+
+    def __init__(self, name, interval, fn, enabled, now):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.enabled = enabled
+        self.next_due = now + interval
+        self.runs = 0
+        self.skips = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+
+class Scheduler:
+    # One tick for all periodic work. The caller owns the actual timer: after each tick() it re-arms a
+    # single-shot timer for the returned delay. A job returns False when it found nothing to do; that
+    # counts as a skip rather than a run.
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._jobs = {}
+
+    def add(self, name, interval, fn, enabled=True):
+        self._jobs[name] = Job(name, interval, fn, enabled, self._clock())
+
+    def enable(self, name, enabled=True):
+        # Enabling restarts the job's countdown, like QTimer.start() did
+        job = self._jobs[name]
+        job.enabled = enabled
+        job.next_due = self._clock() + job.interval
+
+    def next_delay(self):
+        due = [job.next_due for job in self._jobs.values() if job.enabled]
+        if not due:
+            return None
+        return max(0.0, min(due) - self._clock())
+
+    def tick(self):
+        now = self._clock()
+        for job in list(self._jobs.values()):
+            if not job.enabled or job.next_due > now + COALESCE_SLACK:
+                continue
+            # Reschedule before running so a job that opens a dialog can't stall the others
+            while job.next_due <= now + COALESCE_SLACK:
+                job.next_due += job.interval
+            started = time.perf_counter()
+            try:
+                did_work = job.fn()
+            except Exception as e:
+                logger.error("Scheduled job %s failed: %s", job.name, str(e))
+                did_work = True
+            elapsed = time.perf_counter() - started
+            if did_work is False:
+                job.skips += 1
+            else:
+                job.runs += 1
+            job.total += elapsed
+            job.worst = max(job.worst, elapsed)
+        return self.next_delay()
+
+    def stats(self):
+        return {job.name: {"runs": job.runs, "skips": job.skips, "total_ms": round(job.total * 1000, 2),
+                           "worst_ms": round(job.worst * 1000, 2)} for job in self._jobs.values()}
+
+    def report(self):
+        lines = ["Scheduler jobs:"]
+        for name, s in self.stats().items():
+            lines.append(f"  {name:<12} runs={s['runs']:<6} skips={s['skips']:<6} total={s['total_ms']:.1f} ms "
+                         f"worst={s['worst_ms']:.1f} ms")
+        return "\n".join(lines)
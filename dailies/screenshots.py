@@ -0,0 +1,71 @@
+import io
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from dailies.metrics import METRICS
+
+logger = logging.getLogger("AgentX")
+
+EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}
+
+
+class ScreenshotPipeline:
+    # Capture, downscale, encode and save all happen on a small worker pool. on_done(tag, path, error)
+    # is called from the worker when a shot lands (path) or fails (error).
+    def __init__(self, settings, on_done=None):
+        self.format = str(settings.get("format", "PNG")).upper()
+        if self.format not in EXTENSIONS:
+            logger.error("Unknown screenshot format %s, falling back to PNG", self.format)
+            self.format = "PNG"
+        self.quality = int(settings.get("quality", 85))
+        self.max_width = int(settings.get("max_width", 0))
+        self._on_done = on_done
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(settings.get("workers", 2))),
+                                            thread_name_prefix="Screenshot")
+
+    @property
+    def extension(self):
+        return EXTENSIONS[self.format]
+
+    def submit(self, dest_base, tag=None):
+        return self._executor.submit(self._run, dest_base, tag)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, dest_base, tag):
+        path, error = "", ""
+        try:
+            path = self.capture(dest_base)
+        except Exception as e:
+            error = str(e)
+            logger.error("Screenshot failed: %s - Gremlins ate the screenshot!", error)
+        if self._on_done is not None:
+            self._on_done(tag, path, error)
+        return path
+
+    @METRICS.measure("screenshot_capture")
+    def capture(self, dest_base):
+        import pyautogui
+        image = pyautogui.screenshot()
+        path = dest_base + self.extension
+        data = self.encode(image)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        logger.info("Screenshot saved: %s - Captured the moment, Indiana Jones style!", path)
+        return path
+
+    def encode(self, image):
+        if self.max_width and image.width > self.max_width:
+            height = max(1, round(image.height * self.max_width / image.width))
+            image = image.resize((self.max_width, height))
+        buffer = io.BytesIO()
+        if self.format == "PNG":
+            image.save(buffer, format="PNG", compress_level=6)
+        else:
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(buffer, format=self.format, quality=self.quality)
+        return buffer.getvalue()
@@ -0,0 +1,56 @@
+import os
+import time
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger("AgentX")
+
+
+class StartupProfile:
+    # Wall-clock breakdown of startup. mark() closes the phase that ran since the previous mark;
+    # phase() times one block and leaves idle event-loop gaps out of the breakdown.
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+        self.finished = False
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    @contextmanager
+    def phase(self, name):
+        self.last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def total(self):
+        return self.last - self.started
+
+    def report(self):
+        lines = [f"Startup took {self.total() * 1000:.1f} ms"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<24} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def finish(self, path=None):
+        if self.finished:
+            return
+        self.finished = True
+        logger.info("%s", self.report())
+        if not path:
+            return
+        record = {"when": datetime.now().isoformat(timespec="seconds"), "total_ms": round(self.total() * 1000, 1),
+                  "phases": {name: round(seconds * 1000, 1) for name, seconds in self.phases}}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.error("Failed to write startup profile to %s: %s", path, str(e))
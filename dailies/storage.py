@@ -0,0 +1,90 @@
+import os
+import logging
+from html import escape
+
+logger = logging.getLogger("AgentX")
+
+
+def xml_text(value):
+    return escape(value, quote=False)
+
+
+def xml_attr(value):
+    return f'"{escape(value)}"'
+
+
+def iter_xml(filename, tag):
+    # Streams the <tag> elements of a day file. Once the caller is done with one, the root is cleared
+    # too: it still references every finished element otherwise, and memory would grow per record.
+    # A truncated file yields everything before the damage, like the journal's torn-line handling.
+    from xml.etree import ElementTree as ET
+    if not os.path.exists(filename):
+        return
+    root = None
+    try:
+        for event, elem in ET.iterparse(filename, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event == "end" and elem.tag == tag:
+                yield elem
+                root.clear()
+    except ET.ParseError:
+        logger.error("Failed to parse %s", filename)
+
+
+def iter_events_xml(events_file):
+    for event in iter_xml(events_file, "event"):
+        if event.text and event.text.strip():
+            yield {'text': event.text.strip(), 'complete': event.get("complete", "false").lower() == "true",
+                   'color': event.get("color", "#FFFFFF")}
+
+
+def read_events_xml(events_file):
+    return list(iter_events_xml(events_file))
+
+
+def write_events_xml(session_dir, date_str, event_list):
+    from xml.etree import ElementTree as ET
+    os.makedirs(session_dir, exist_ok=True)
+    events_file = os.path.join(session_dir, "events.xml")
+    if event_list:
+        root = ET.Element("events")
+        for event in event_list:
+            event_elem = ET.SubElement(root, "event")
+            event_elem.set("complete", "true" if event['complete'] else "false")
+            event_elem.set("color", event.get('color', "#FFFFFF"))
+            event_elem.text = event['text']
+        tree = ET.ElementTree(root)
+        tmp_file = events_file + ".tmp"
+        tree.write(tmp_file, encoding="utf-8", xml_declaration=True)
+        os.replace(tmp_file, events_file)
+        logger.info("Saved events to %s", events_file)
+    else:
+        if os.path.exists(events_file):
+            os.remove(events_file)
+        logger.info("Removed empty events.xml for %s", date_str)
+
+
+def iter_shifts_xml(shifts_filename):
+    for shift in iter_xml(shifts_filename, "shift"):
+        yield {"type": shift.get("type"), "timestamp": shift.get("timestamp"),
+               "duration": float(shift.get("duration", 0)), "worked": float(shift.get("worked", 0))}
+
+
+def read_shifts_xml(shifts_filename):
+    return list(iter_shifts_xml(shifts_filename))
+
+
+def write_shifts_xml(session_dir, date_str, shifts):
+    shifts_filename = os.path.join(session_dir, "shifts.xml")
+    tmp_filename = shifts_filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<shifts date="{date_str}">\n')
+        for s in shifts:
+            duration = s.get("duration", 0)
+            worked = s.get("worked", 0)
+            f.write(f' <shift type="{s["type"]}" timestamp="{s["timestamp"]}" duration="{duration}" worked="{worked}"></shift>\n')
+        f.write('</shifts>\n')
+    os.replace(tmp_filename, shifts_filename)
+    logger.info("Updated shifts XML: %s", shifts_filename)
+
@@ -0,0 +1,395 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import threading
+from contextlib import nullcontext
+
+from dailies.ledger import CHECKPOINT_PREFIX, HOSTNAME, _owner_alive
+
+logger = logging.getLogger("AgentX")
+
+DAY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+STATE_FILENAME = ".sync_state.json"
+# Held by whichever process is syncing local_dir: the app and the detached report job share the state
+# file, and two passes interleaving would each record file stats the other never saw
+LOCK_FILENAME = ".sync.lock"
+# A lock whose owner cannot be checked directly is taken over once it is this old
+STALE_LOCK_S = 3600
+# Append-only line files: when both sides changed, the union of their lines is the right answer. The
+# app appends to these while a sync runs, so they are only ever appended to here, never replaced.
+UNION_MERGE_FILES = ("notes.journal", "time.ledger")
+CONFLICT_SUFFIX = ".conflict"
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _copy_atomic(src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".tmp"
+    shutil.copy2(src, tmp)  # copy2 keeps the mtime, which is what the other side compares against
+    os.replace(tmp, dst)
+
+
+def _read_lines(path):
+    # Complete lines only: an unterminated last line is a write still in flight and is left for next time
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    lines = data.split(b"\n")[:-1]
+    return [line.decode("utf-8", "replace") for line in lines if line.strip()]
+
+
+def _append_lines(path, lines):
+    if not lines:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = "".join(line + "\n" for line in lines).encode("utf-8")
+    with open(path, "ab") as f:
+        # A line torn by a crash must not swallow the first appended one
+        if f.tell() > 0:
+            with open(path, "rb") as tail:
+                tail.seek(-1, os.SEEK_END)
+                if tail.read(1) != b"\n":
+                    data = b"\n" + data
+        f.write(data)
+    # Appending leaves the directory mtime alone; bump it so unchanged-day skipping sees the change
+    os.utime(os.path.dirname(path))
+
+
+def union_merge(local_path, remote_path, local_lock=None):
+    # Appends each side's missing lines to the other; returns (lines added locally, lines added remotely).
+    # local_lock is held while the local file is read and appended, so the app's own writer cannot
+    # interleave with it.
+    remote_lines = _read_lines(remote_path)
+    with local_lock or nullcontext():
+        local_lines = _read_lines(local_path)
+        known = set(local_lines)
+        pulled = []
+        for line in remote_lines:
+            if line not in known:
+                known.add(line)
+                pulled.append(line)
+        _append_lines(local_path, pulled)
+    known = set(remote_lines)
+    pushed = []
+    for line in local_lines:
+        if line not in known:
+            known.add(line)
+            pushed.append(line)
+    _append_lines(remote_path, pushed)
+    return len(pulled), len(pushed)
+
+
+def _synced_name(name):
+    return not (name.endswith(".tmp") or CONFLICT_SUFFIX in name or name.startswith(CHECKPOINT_PREFIX))
+
+
+def _walk_day(root, date_str):
+    # Relative paths of every synced file in one day directory, screenshot folders included. Running-span
+    # checkpoints belong to the instance that wrote them and stay on their machine.
+    day_dir = os.path.join(root, date_str)
+    found = set()
+    for dirpath, _, filenames in os.walk(day_dir):
+        for name in filenames:
+            if _synced_name(name):
+                found.add(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/"))
+    return found
+
+
+def _day_signature(root, date_str):
+    # Directory mtimes of the day and its task folders. Files replaced or created in them show up here;
+    # in-place appends do not, which is why _append_lines bumps the directory and today is always
+    # synced explicitly.
+    day_dir = os.path.join(root, date_str)
+    try:
+        signature = [os.stat(day_dir).st_mtime_ns]
+        with os.scandir(day_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    signature.append([entry.name, entry.stat().st_mtime_ns])
+    except OSError:
+        return None
+    signature[1:] = sorted(signature[1:])
+    return signature
+
+
+def _acquire_lock(path):
+    # O_EXCL create is atomic on local disks; returns False while another live process holds the lock
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not _lock_is_stale(path):
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(f"{HOSTNAME} {os.getpid()}")
+        return True
+    return False
+
+
+def _lock_is_stale(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            host, pid = f.read().rsplit(" ", 1)
+        owner = (host, int(pid))
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return True
+    except (OSError, ValueError):
+        # Unreadable or still being written: only its age can tell
+        owner = None
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return True
+    return not _owner_alive(owner, mtime, time.time(), STALE_LOCK_S)
+
+
+def _list_days(root):
+    try:
+        with os.scandir(root) as entries:
+            return {entry.name for entry in entries if DAY_DIR_RE.match(entry.name) and entry.is_dir()}
+    except OSError:
+        return set()
+
+
+class SyncResult:
+    def __init__(self):
+        self.pushed = 0
+        self.pulled = 0
+        self.merged = 0
+        self.deleted = 0
+        self.skipped_days = 0
+        self.busy = False  # another process was syncing the same local store; nothing was done
+        self.conflicts = []
+        self.changed_local = set()  # relative paths whose local copy this pass rewrote or appended to
+        self.error = ""
+        self.finished = None
+
+    def summary(self):
+        if self.busy:
+            return "skipped (another sync is running)"
+        if self.error:
+            return f"offline ({self.error})"
+        text = f"{self.pushed} up, {self.pulled} down"
+        if self.deleted:
+            text += f", {self.deleted} deleted"
+        if self.merged:
+            text += f", {self.merged} merged"
+        if self.conflicts:
+            text += f", {len(self.conflicts)} conflicts"
+        return text
+
+
+class Synchronizer:
+    # Two-way sync between the local session store (the app's primary) and the shared directory.
+    # Every file's (mtime, size) on both sides is remembered from the last sync, so each side's
+    # changes are known without comparing contents:
+    #   only local changed  -> push          only remote changed -> pull
+    #   both changed        -> union merge for append-only journals, otherwise the newer file wins
+    #                          and the other is kept next to it as <name>.conflict
+    #   deleted on one side and untouched on the other -> delete
+    # Journals are merged by appending in both directions, and a local journal is never deleted.
+    # local_lock(path) may return a lock the app holds while appending to that local file.
+    # Only one process syncs a local store at a time (LOCK_FILENAME); a pass that finds it taken is
+    # skipped, and the state another process saved meanwhile is reloaded before the next one.
+    # Nothing here knows about Qt; the app runs sync() on a background thread.
+    def __init__(self, local_dir, remote_dir, local_lock=None):
+        self.local_dir = local_dir
+        self.remote_dir = remote_dir
+        self.local_lock = local_lock or (lambda path: None)
+        self.state_path = os.path.join(local_dir, STATE_FILENAME)
+        self.lock_path = os.path.join(local_dir, LOCK_FILENAME)
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._state_stat = None
+        self._files, self._days = self._load_state()
+
+    def _load_state(self):
+        self._state_stat = _stat(self.state_path)
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if "files" not in state:
+            return state, {}  # state written before day signatures were kept
+        return state["files"], state["days"]
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"files": self._files, "days": self._days}, f)
+        os.replace(tmp, self.state_path)
+        self._state_stat = _stat(self.state_path)
+
+    def mark_dirty(self, date_str):
+        with self._lock:
+            self._dirty.add(date_str)
+
+    def sync(self, dates=None):
+        # dates=None syncs every day on either side, skipping days whose directories have not changed
+        # since they were last synced; otherwise only the given days plus any marked dirty
+        result = SyncResult()
+        with self._sync_lock:
+            if not os.path.isdir(self.remote_dir):
+                result.error = f"{self.remote_dir} unreachable"
+                result.finished = time.time()
+                return result
+            os.makedirs(self.local_dir, exist_ok=True)
+            if not _acquire_lock(self.lock_path):
+                result.busy = True
+                result.finished = time.time()
+                with self._lock:
+                    self._dirty |= set(dates or ())
+                logger.info("Sync of %s skipped - another process is syncing it", self.local_dir)
+                return result
+            try:
+                self._sync_locked(dates, result)
+            finally:
+                os.remove(self.lock_path)
+        result.finished = time.time()
+        if result.pushed or result.pulled or result.merged or result.conflicts:
+            logger.info("Sync %s <-> %s: %s", self.local_dir, self.remote_dir, result.summary())
+        return result
+
+    def _sync_locked(self, dates, result):
+        if _stat(self.state_path) != self._state_stat:
+            # Another process synced since we last looked; its record of both sides is the current one
+            self._files, self._days = self._load_state()
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if dates is None:
+            days = _list_days(self.local_dir) | _list_days(self.remote_dir)
+        else:
+            days = set(dates) | dirty
+        known_files = {}
+        for rel in self._files:
+            known_files.setdefault(rel.split("/", 1)[0], []).append(rel)
+        try:
+            for date_str in sorted(days):
+                signature = [_day_signature(self.local_dir, date_str), _day_signature(self.remote_dir, date_str)]
+                if dates is None and date_str not in dirty and self._days.get(date_str) == signature:
+                    result.skipped_days += 1
+                    continue
+                self._sync_day(date_str, known_files.get(date_str, []), result)
+                self._days[date_str] = [_day_signature(self.local_dir, date_str),
+                                        _day_signature(self.remote_dir, date_str)]
+        except OSError as e:
+            # Share dropped mid-sync: whatever was done is recorded, the rest waits for the next pass
+            result.error = str(e)
+            with self._lock:
+                self._dirty |= days
+        self._save_state()
+
+    def _sync_day(self, date_str, known_files, result):
+        paths = _walk_day(self.local_dir, date_str) | _walk_day(self.remote_dir, date_str) | set(known_files)
+        for rel in sorted(paths):
+            self._sync_file(rel, result)
+
+    def _sync_file(self, rel, result):
+        local = os.path.join(self.local_dir, *rel.split("/"))
+        remote = os.path.join(self.remote_dir, *rel.split("/"))
+        local_stat, remote_stat = _stat(local), _stat(remote)
+        known = self._files.get(rel)
+        known_local, known_remote = (known[0], known[1]) if known else (None, None)
+        local_changed = local_stat != known_local
+        remote_changed = remote_stat != known_remote
+
+        if not local_changed and not remote_changed:
+            return
+        if local_stat is None and remote_stat is None:
+            self._files.pop(rel, None)
+            return
+        if os.path.basename(rel) in UNION_MERGE_FILES:
+            self._sync_union(rel, local, remote, local_stat, remote_stat, local_changed, remote_changed, result)
+            return
+        # A copied file's source is recorded as it was stat'ed before the copy: anything appended while
+        # copying then still shows up as a change next time. The destination is stat'ed afresh.
+        if local_changed and not remote_changed:
+            if local_stat is None:
+                os.remove(remote)
+                result.deleted += 1
+                self._files.pop(rel, None)
+                return
+            _copy_atomic(local, remote)
+            result.pushed += 1
+            self._files[rel] = [local_stat, _stat(remote)]
+        elif remote_changed and not local_changed:
+            if remote_stat is None:
+                os.remove(local)
+                result.deleted += 1
+                result.changed_local.add(rel)
+                self._files.pop(rel, None)
+                return
+            _copy_atomic(remote, local)
+            result.pulled += 1
+            result.changed_local.add(rel)
+            self._files[rel] = [_stat(local), remote_stat]
+        elif local_stat is None or remote_stat is None:
+            # Deleted on one side, changed on the other: the surviving copy wins
+            if local_stat is None:
+                _copy_atomic(remote, local)
+                result.pulled += 1
+                result.changed_local.add(rel)
+                self._files[rel] = [_stat(local), remote_stat]
+            else:
+                _copy_atomic(local, remote)
+                result.pushed += 1
+                self._files[rel] = [local_stat, _stat(remote)]
+        else:
+            # Newer wins; the loser stays beside it so nothing is silently lost
+            if local_stat[0] >= remote_stat[0]:
+                _copy_atomic(remote, local + CONFLICT_SUFFIX)
+                _copy_atomic(local, remote)
+                self._files[rel] = [local_stat, _stat(remote)]
+            else:
+                _copy_atomic(local, local + CONFLICT_SUFFIX)
+                _copy_atomic(remote, local)
+                result.changed_local.add(rel)
+                self._files[rel] = [_stat(local), remote_stat]
+            result.conflicts.append(rel)
+            logger.warning("Sync conflict on %s - kept the newer copy, older saved as %s%s", rel, rel,
+                           CONFLICT_SUFFIX)
+
+    def _sync_union(self, rel, local, remote, local_stat, remote_stat, local_changed, remote_changed, result):
+        if local_stat is None and not remote_changed:
+            # Compaction folded the local journal away; the remote copy goes the same way
+            os.remove(remote)
+            result.deleted += 1
+            self._files.pop(rel, None)
+            return
+        if remote_stat is None and not local_changed:
+            # The app may be appending to the local file right now, so it is kept; the share gets it
+            # back the next time it changes locally
+            self._files[rel] = [local_stat, None]
+            return
+        pulled, pushed = union_merge(local, remote, self.local_lock(local))
+        if pulled and pushed:
+            result.merged += 1
+        elif pulled:
+            result.pulled += 1
+        elif pushed:
+            result.pushed += 1
+        if pulled:
+            result.changed_local.add(rel)
+        # The stats from before the merge are only recorded for a side that was not appended to: a
+        # side that was gets checked again next pass, which finds nothing to add and settles
+        self._files[rel] = [None if pulled else local_stat, None if pushed else remote_stat]
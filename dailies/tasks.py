@@ -0,0 +1,11 @@
+TASKS = ["code", "research", "building", "meeting", "field", "social"]
+
+TASK_COLORS = {
+    "code": {"bg": "#ff9999", "fg": "#fff"},
+    "research": {"bg": "#ffcc99", "fg": "#fff"},
+    "building": {"bg": "#ffffcc", "fg": "#000"},
+    "meeting": {"bg": "#99ff99", "fg": "#000"},
+    "field": {"bg": "#9999ff", "fg": "#fff"},
+    "social": {"bg": "#cc99ff", "fg": "#fff"},
+    "default": {"bg": "#e6e6e6", "fg": "#000"}
+}
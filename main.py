@@ -1,24 +1,47 @@
 import sys
 import os
 import time
+import sqlite3
+import threading
+import subprocess
+from dailies.startup import StartupProfile
+
+# Started before the heavy imports so the profile covers them
+STARTUP = StartupProfile()
+
 import logging
-import webbrowser
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-from xml.etree import ElementTree as ET
-import pyautogui
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-QPushButton, QTextEdit, QLabel, QFrame, QMessageBox, QDateEdit, QDialog, QFormLayout, QComboBox, QCalendarWidget, QLineEdit, QGridLayout, QListWidget, QListWidgetItem, QInputDialog, QCheckBox, QColorDialog)
-from PyQt6.QtCore import QTimer, Qt, QDate, QPoint, pyqtSignal
-from PyQt6.QtGui import QColor, QPalette
+QPushButton, QTextEdit, QLabel, QFrame, QMessageBox, QDateEdit, QDialog, QFormLayout, QComboBox, QCalendarWidget, QLineEdit, QGridLayout, QListView, QInputDialog, QColorDialog, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QTableWidget, QTableWidgetItem, QCheckBox, QListWidget, QListWidgetItem)
+from PyQt6.QtCore import QTimer, Qt, QDate, QEvent, QPoint, QObject, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QPalette, QKeySequence, QShortcut
+from dailies.config import load_config, session_dirs
+from dailies.events import MonthEventStore, adjacent_months, month_of
+from dailies.index import SessionIndex
+from dailies.io_worker import WriteQueue
+from dailies.journal import SHUTDOWN_MARKER, Note, NoteJournal, note_digest, replay_journal
+from dailies.ledger import TimeLedger, read_ledger
+from dailies.logs import setup_logging
+from dailies.metrics import METRICS
+from dailies.reports import format_minutes
+from dailies.scheduler import Scheduler
+from dailies.sync import Synchronizer
+from dailies.storage import read_shifts_xml, write_events_xml, write_shifts_xml
+from dailies.tasks import TASK_COLORS, TASKS
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logger = logging.getLogger("AgentX")
 
-# Base directory for sessions
-BASE_DIR = r"G:\expo\Software\Dailies\Dailies\dailies\sessions"
-if not os.path.exists(BASE_DIR):
-    os.makedirs(BASE_DIR)
+CONFIG = load_config()
+METRICS.enabled = CONFIG["metrics_enabled"]
+
+# Sessions live in a local store the app reads and writes (created on first hydration rather than
+# at import); SHARE_DIR is the shared copy it syncs with in the background, or None without a mirror
+BASE_DIR, SHARE_DIR = session_dirs(CONFIG)
+# Marks a pending close-of-day entry that wants the journal compacted and notes.html rendered, no report
+PENDING_NOTES_ONLY = "notes"
+
+STARTUP.mark("imports")
 
 def invert_color(hex_color):
     hex_color = hex_color.lstrip('#')
@@ -28,94 +51,332 @@ def invert_color(hex_color):
         inv_r, inv_g, inv_b = min(inv_r + 50, 255), min(inv_g + 50, 255), min(inv_b + 50, 255)
     return f"#{inv_r:02x}{inv_g:02x}{inv_b:02x}"
 
-def format_minutes(minutes):
-    hours = int(minutes // 60)
-    mins = int(minutes % 60)
-    return f"{hours}h {mins}m"
-
 class EventCalendar(QCalendarWidget):
+    DOT_RADIUS = 3
+    DOT_SPACING = 2
+    MAX_DOTS = 4
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.event_dates = set() # set of QDate
-        self.events = {}  # date_str: list of dicts
+        self.events = None  # MonthEventStore of date_str: list of dicts
+        # Julian day -> (total_width, ((x_offset, brush), ...)) for the visible page
+        self._paint_cache = {}
+        self._brushes = {}
+        self.currentPageChanged.connect(lambda year, month: self._paint_cache.clear())
+
+    def invalidate_day(self, date_str):
+        self._paint_cache.pop(QDate.fromString(date_str, "yyyy-MM-dd").toJulianDay(), None)
+        self.update()
+
+    def _brush(self, hex_color):
+        brush = self._brushes.get(hex_color)
+        if brush is None:
+            brush = self._brushes[hex_color] = QBrush(QColor(hex_color))
+        return brush
+
+    def _dots(self, date):
+        julian_day = date.toJulianDay()
+        dots = self._paint_cache.get(julian_day)
+        if dots is not None:
+            return dots
+        if self.events is None or not self.events.is_loaded(date.year(), date.month()):
+            return None  # Not cached until its month lands, so the prefetch repaint picks it up
+        events = (self.events.peek(date.toString("yyyy-MM-dd")) or [])[:self.MAX_DOTS]
+        dot_diam = self.DOT_RADIUS * 2
+        total_width = len(events) * dot_diam + (len(events) - 1) * self.DOT_SPACING
+        dots = (total_width, tuple((i * (dot_diam + self.DOT_SPACING), self._brush(event.get('color', '#FF0000')))
+                                   for i, event in enumerate(events)))
+        self._paint_cache[julian_day] = dots
+        return dots
 
     def paintCell(self, painter, rect, date):
         super().paintCell(painter, rect, date)
-        date_str = date.toString("yyyy-MM-dd")
-        if date_str in self.events:
-            events = self.events[date_str][:4]
-            dot_radius = 3
-            dot_diam = dot_radius * 2
-            spacing = 2
-            total_width = len(events) * dot_diam + (len(events) - 1) * spacing
-            start_x = rect.x() + (rect.width() - total_width) // 2
-            y = rect.y() + rect.height() - dot_radius - 2  # near bottom
-            for i, event in enumerate(events):
-                x = start_x + i * (dot_diam + spacing)
-                painter.setBrush(QColor(event.get('color', '#FF0000')))
-                painter.drawEllipse(x, y, dot_diam, dot_diam)
-
-class EventItemWidget(QWidget):
-    complete_changed = pyqtSignal(bool)
-    text_changed = pyqtSignal(str)
-    color_changed = pyqtSignal(str)
-
-    def __init__(self, text, complete, color_hex, parent=None):
+        dots = self._dots(date)
+        if not dots or not dots[1]:
+            return
+        total_width, offsets = dots
+        dot_diam = self.DOT_RADIUS * 2
+        start_x = rect.x() + (rect.width() - total_width) // 2
+        y = rect.y() + rect.height() - self.DOT_RADIUS - 2  # near bottom
+        for x_offset, brush in offsets:
+            painter.setBrush(brush)
+            painter.drawEllipse(start_x + x_offset, y, dot_diam, dot_diam)
+
+class EventListModel(QAbstractListModel):
+    # Edits the selected day's event dicts in place; event_edited(date_str, role) tells the app to persist
+    ColorRole = Qt.ItemDataRole.UserRole + 1
+    event_edited = pyqtSignal(str, int)
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.layout = QHBoxLayout(self)
-        self.layout.setContentsMargins(0, 0, 0, 0)
-        self.checkbox = QCheckBox()
-        self.checkbox.setChecked(complete)
-        self.checkbox.toggled.connect(self.complete_changed.emit)
-        self.text_edit = QLineEdit(text)
-        self.text_edit.textChanged.connect(self.text_changed.emit)
-        self.color_btn = QPushButton()
-        self.color_btn.setFixedSize(20, 20)
-        self.set_color(color_hex)
-        self.color_btn.clicked.connect(self.pick_color)
-        self.layout.addWidget(self.checkbox)
-        self.layout.addWidget(self.text_edit)
-        self.layout.addStretch()
-        self.layout.addWidget(self.color_btn)
-
-    def pick_color(self):
-        color = QColorDialog.getColor(QColor(self.current_color))
-        if color.isValid():
-            new_color = color.name()
-            self.set_color(new_color)
-            self.color_changed.emit(new_color)
-
-    def set_color(self, hex_color):
-        self.current_color = hex_color
-        self.color_btn.setStyleSheet(f"background-color: {hex_color}; border: 1px solid #000;")
+        self.date_str = ""
+        self.events = []
+
+    def set_day(self, date_str, events):
+        self.beginResetModel()
+        self.date_str = date_str
+        self.events = events
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.events)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        event = self.events[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return event['text']
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if event['complete'] else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.DecorationRole:
+            return QColor(event.get('color', '#FFFFFF'))
+        if role == self.ColorRole:
+            return event.get('color', '#FFFFFF')
+        return None
+
+    def flags(self, index):
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+                | Qt.ItemFlag.ItemIsUserCheckable)
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        event = self.events[index.row()]
+        if role == Qt.ItemDataRole.EditRole:
+            text = str(value).strip()
+            if text == event['text']:
+                return False
+            event['text'] = text
+        elif role == Qt.ItemDataRole.CheckStateRole:
+            event['complete'] = Qt.CheckState(value) == Qt.CheckState.Checked
+        elif role == self.ColorRole:
+            event['color'] = value
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        self.event_edited.emit(self.date_str, int(role))
+        return True
+
+    def append_event(self, event):
+        row = len(self.events)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.events.append(event)
+        self.endInsertRows()
+
+    def remove_event(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.events[row]
+        self.endRemoveRows()
+
+class EventItemDelegate(QStyledItemDelegate):
+    # Checkbox and in-place text editing come from the default delegate; the colour swatch sits on the right
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.decorationPosition = QStyleOptionViewItem.Position.Right
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            opt = QStyleOptionViewItem(option)
+            self.initStyleOption(opt, index)
+            style = opt.widget.style() if opt.widget else QApplication.style()
+            swatch = style.subElementRect(QStyle.SubElement.SE_ItemViewItemDecoration, opt, opt.widget)
+            if swatch.contains(event.position().toPoint()):
+                color = QColorDialog.getColor(QColor(index.data(EventListModel.ColorRole)))
+                if color.isValid():
+                    model.setData(index, color.name(), EventListModel.ColorRole)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+class EventWriteBehind(QObject):
+    # Coalesces event edits: each edit marks its day dirty and restarts the debounce timer,
+    # so a burst of keystrokes costs one events.xml write per day.
+    def __init__(self, save_fn, delay_ms, parent=None):
+        super().__init__(parent)
+        self.save_fn = save_fn
+        self.dirty = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.flush)
+
+    def mark_dirty(self, date_str):
+        self.dirty.add(date_str)
+        self.timer.start()
+
+    def flush(self):
+        self.timer.stop()
+        dirty, self.dirty = self.dirty, set()
+        for date_str in sorted(dirty):
+            self.save_fn(date_str)
+        if dirty:
+            logger.debug("Agent X: Flushed event edits for %d day(s) - Write-behind, Jedi mind trick!", len(dirty))
+
+class PersistenceSignals(QObject):
+    # Emitted from the persistence thread; Qt queues delivery onto the GUI thread
+    write_finished = pyqtSignal(str, bool, str, object)
+    screenshot_finished = pyqtSignal(object, str, str)
+    month_loaded = pyqtSignal(int, int)
+    sync_finished = pyqtSignal(object)
+    index_refreshed = pyqtSignal()
+
+class DiagnosticsDialog(QDialog):
+    # Hidden panel (Ctrl+Shift+D): live latency histograms plus the scheduler and startup breakdowns
+    COLUMNS = ("operation", "count", "p50 ms", "p95 ms", "max ms", "total ms")
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.setWindowTitle("Diagnostics")
+        self.resize(640, 480)
+        layout = QVBoxLayout(self)
+        self.enabled_box = QCheckBox("Record timings")
+        self.enabled_box.setChecked(METRICS.enabled)
+        self.enabled_box.toggled.connect(self.set_enabled)
+        layout.addWidget(self.enabled_box)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table, stretch=1)
+        self.details = QTextEdit()
+        self.details.setReadOnly(True)
+        layout.addWidget(self.details, stretch=1)
+        buttons = QHBoxLayout()
+        for label, slot in (("Refresh", self.refresh), ("Reset", self.reset), ("Dump", self.dump)):
+            btn = QPushButton(label)
+            btn.clicked.connect(slot)
+            buttons.addWidget(btn)
+        layout.addLayout(buttons)
+        # Only ticks while the panel is open
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def set_enabled(self, enabled):
+        METRICS.enabled = enabled
+        self.refresh()
+
+    def reset(self):
+        METRICS.reset()
+        self.refresh()
+
+    def dump(self):
+        path = self.app.dump_metrics()
+        if path:
+            self.app.status_label.setText(f"metrics written to {path}")
+
+    def refresh(self):
+        snapshot = METRICS.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (name, s) in enumerate(snapshot.items()):
+            values = (name, s["count"], s["p50_ms"], s["p95_ms"], s["max_ms"], s["total_ms"])
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(str(value)))
+        self.details.setPlainText(f"Write queue pending: {self.app.io_worker.pending()}\n\n"
+                                  f"{self.app.scheduler.report()}\n\n{STARTUP.report()}")
+
+class SearchDialog(QDialog):
+    # Full-text search over every day's notes, subtasks and events; activating a hit jumps the calendar there
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.setWindowTitle("Search Notes")
+        self.resize(600, 500)
+        layout = QVBoxLayout(self)
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Search notes, subtasks and events")
+        self.query.textChanged.connect(lambda text: self.timer.start())
+        layout.addWidget(self.query)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.open_hit)
+        layout.addWidget(self.results, stretch=1)
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+        # Searches once typing pauses instead of on every keystroke
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(150)
+        self.timer.timeout.connect(self.run_search)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.query.setFocus()
+        self.query.selectAll()
+        self.app.refresh_search_index()
+
+    def run_search(self):
+        self.results.clear()
+        text = self.query.text().strip()
+        if not text:
+            self.status.setText("")
+            return
+        started = time.perf_counter()
+        try:
+            hits = self.app.session_index.search(text)
+        except sqlite3.Error as e:
+            logger.error("Search for %r failed: %s", text, str(e))
+            self.status.setText("search failed")
+            return
+        for date_str, kind, timestamp, task, subtask, snippet in hits:
+            if kind == "event":
+                label = f"{date_str}  event: {snippet}"
+            else:
+                subtask_str = f" /{subtask}" if subtask else ""
+                label = f"{date_str} {timestamp}  [{task}{subtask_str}] {snippet}"
+            item = QListWidgetItem(label)
+            item.setData(Qt.ItemDataRole.UserRole, date_str)
+            self.results.addItem(item)
+        status = f"{len(hits)} hits in {(time.perf_counter() - started) * 1000:.0f} ms"
+        if self.app.search_indexing:
+            status += " (still indexing older days...)"
+        self.status.setText(status)
+
+    def open_hit(self, item):
+        self.app.jump_to_day(item.data(Qt.ItemDataRole.UserRole))
 
 class DailiesApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Dailies")
         self.setGeometry(100, 100, 800, 800)
+        self.config = CONFIG
 
         self.today = datetime.now().strftime("%Y-%m-%d")
         self.session_dir = os.path.join(BASE_DIR, self.today)
-        os.makedirs(self.session_dir, exist_ok=True)
-        logger.debug("Agent X: Base of operations established at %s - The Force is strong with this one!",
-                     self.session_dir)
+
+        # All disk writes go through one ordered background queue so a slow share never freezes the UI
+        self.io_signals = PersistenceSignals()
+        self.io_signals.write_finished.connect(self.on_write_finished)
+        self.io_worker = WriteQueue(on_done=self.io_signals.write_finished.emit)
+        # Set once the window starts closing: follow-up work (reloads, merges, report popups) is dropped
+        # from then on, while the close path's own writes still go through the queue until it is closed
+        self.closing = False
+        self.io_signals.screenshot_finished.connect(self.on_screenshot_finished)
+        # The search index is local SQLite, not a session file: its refreshes run here instead, so a
+        # full rebuild never holds up the write queue
+        self.index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SearchIndex")
+
+        # Offline-first: everything above works on the local store; the share is only touched by sync
+        self.sync = Synchronizer(BASE_DIR, SHARE_DIR, self.sync_lock_for) if SHARE_DIR is not None else None
+        self.sync_thread = None
+        self.io_signals.sync_finished.connect(self.on_sync_finished)
+        self._screenshots = None
 
         self.notes = []
-        self.task_colors = {
-            "code": {"bg": "#ff9999", "fg": "#fff"},
-            "research": {"bg": "#ffcc99", "fg": "#fff"},
-            "building": {"bg": "#ffffcc", "fg": "#000"},
-            "meeting": {"bg": "#99ff99", "fg": "#000"},
-            "field": {"bg": "#9999ff", "fg": "#fff"},
-            "social": {"bg": "#cc99ff", "fg": "#fff"},
-            "default": {"bg": "#e6e6e6", "fg": "#000"}
-        }
-        self.task_times = {task: 0.0 for task in self.task_colors.keys()}
-        self.load_existing_notes()
-        self.check_last_shutdown()
-
-        self.current_task_start = time.time()
+        self.task_colors = {task: dict(colors) for task, colors in TASK_COLORS.items()}
+        self.journal = NoteJournal(self.session_dir, self.today, self.task_colors)
+        # Time per task comes from start/end spans; the running span opens once the day has loaded
+        self.ledger = TimeLedger(self.session_dir, stale_after=3 * self.config["flush_interval_s"])
+
         self.current_task = "default"
         self.current_subtask = ""
 
@@ -140,7 +401,7 @@ class DailiesApp(QMainWindow):
         # Task buttons at top, vertical
         self.task_frame = QWidget()
         self.task_layout = QVBoxLayout(self.task_frame)
-        self.tasks = ["code", "research", "building", "meeting", "field", "social"]
+        self.tasks = list(TASKS)
         self.task_buttons = {}
         for task in self.tasks:
             btn = QPushButton(task)
@@ -180,6 +441,18 @@ class DailiesApp(QMainWindow):
         self.past_report_button.clicked.connect(self.generate_past_report)
         self.left_toolbar_layout.addWidget(self.past_report_button)
 
+        # View Notes button (white): notes.html is only rendered when someone asks for it
+        self.view_notes_button = QPushButton("View Notes")
+        self.view_notes_button.setStyleSheet("background-color: white;")
+        self.view_notes_button.clicked.connect(self.view_notes)
+        self.left_toolbar_layout.addWidget(self.view_notes_button)
+
+        # Search button (white)
+        self.search_button = QPushButton("Search")
+        self.search_button.setStyleSheet("background-color: white;")
+        self.search_button.clicked.connect(self.show_search)
+        self.left_toolbar_layout.addWidget(self.search_button)
+
         # Work buttons
         self.work_in_btn = QPushButton("WORK IN")
         self.work_in_btn.clicked.connect(self.work_in)
@@ -225,6 +498,10 @@ class DailiesApp(QMainWindow):
         self.status_label.setStyleSheet("color: cyan")
         self.note_layout.addWidget(self.status_label)
 
+        self.sync_label = QLabel("sync: off" if SHARE_DIR is None else "sync: waiting")
+        self.sync_label.setStyleSheet("color: gray")
+        self.note_layout.addWidget(self.sync_label)
+
         # Log window below notes
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
@@ -248,7 +525,14 @@ border-right: 1px solid black;\
         self.right_toolbar_layout.addWidget(self.calendar)
 
         # Event list below calendar
-        self.event_list = QListWidget()
+        self.event_model = EventListModel(self)
+        self.event_list = QListView()
+        self.event_list.setModel(self.event_model)
+        self.event_delegate = EventItemDelegate(self.event_list)
+        self.event_list.setItemDelegate(self.event_delegate)
+        self.event_list.setUniformItemSizes(True)
+        self.event_list.setEditTriggers(QListView.EditTrigger.DoubleClicked | QListView.EditTrigger.EditKeyPressed
+                                        | QListView.EditTrigger.SelectedClicked)
         self.right_toolbar_layout.addWidget(self.event_list)
 
         # Buttons for adding and deleting events
@@ -261,12 +545,23 @@ border-right: 1px solid black;\
         event_buttons_layout.addWidget(delete_event_btn)
         self.right_toolbar_layout.addLayout(event_buttons_layout)
 
-        # Events data
-        self.events = {} # date_str: list of {'text': str, 'complete': bool}
-        self.load_events()
+        # Events data, loaded a month at a time as the calendar pages
+        self.session_index = SessionIndex(self.config["index_path"])
+        self.search_dialog = None
+        self.search_indexing = False
+        self.io_signals.index_refreshed.connect(self.on_search_index_refreshed)
+        self.io_signals.month_loaded.connect(self.on_event_month_loaded)
+        self.events = MonthEventStore(self.load_event_month, capacity=self.config["event_months_cached"],
+                                      on_loaded=self.io_signals.month_loaded.emit)
         self.calendar.events = self.events
-        self.calendar.event_dates = {QDate.fromString(d, "yyyy-MM-dd") for d in self.events}
+        self.event_writes = EventWriteBehind(self.save_events, self.config["event_save_delay_ms"], self)
+        self.event_model.event_edited.connect(self.on_event_edited)
+        self.event_delegate.closeEditor.connect(lambda editor, hint: self.event_writes.flush())
+        # Flush pending edits before the list or month cache moves on to another date
+        self.calendar.selectionChanged.connect(self.event_writes.flush)
         self.calendar.selectionChanged.connect(self.update_event_list)
+        self.calendar.currentPageChanged.connect(lambda year, month: self.event_writes.flush())
+        self.calendar.currentPageChanged.connect(self.on_calendar_page_changed)
 
         # Middle space for right toolbar
         self.right_toolbar_layout.addStretch()
@@ -297,127 +592,343 @@ border-right: 1px solid black;\
         calc_layout.addLayout(grid)
         self.right_toolbar_layout.addWidget(self.calculator)
 
-        # Load shifts after UI setup
-        self.load_work_shifts()
+        # All periodic work shares one single-shot timer, re-armed for whichever job is due next.
+        # It starts once the session has hydrated.
+        self.running = True
+        self.scheduler = Scheduler()
+        self.scheduler.add("prompt", 15 * 60, self.queue_prompt, enabled=False)
+        self.scheduler.add("checkpoint", self.config["flush_interval_s"], self.checkpoint_time, enabled=False)
+        self.scheduler.add("worked", 60, self.tick_worked_time, enabled=False)
+        self.scheduler.add("merge", self.config["flush_interval_s"], self.merge_other_writers, enabled=False)
+        self.scheduler.add("sync", self.config["sync_interval_s"], self.sync_today, enabled=False)
+        self.tick_timer = QTimer()
+        self.tick_timer.setSingleShot(True)
+        self.tick_timer.timeout.connect(self.on_tick)
+
+        self.diagnostics = None
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.show_diagnostics)
+        QShortcut(QKeySequence("Ctrl+F"), self, activated=self.show_search)
 
-        # Load recent subtasks
-        self.load_recent_subtasks()
+        self.update_shift_buttons()
+        self.update_worked_time()
 
-        # Timers
-        self.running = True
-        self.prompt_timer = QTimer()
-        self.prompt_timer.timeout.connect(self.show_prompt)
-        self.prompt_timer.start(15 * 60 * 1000) # 15 minutes
+        # Session data loads after the first paint; keep input off until it has landed
+        self.hydrated = False
+        self.hydration_steps = [
+            ("session dir", self.ensure_session_dir),
+            ("notes", self.load_existing_notes),
+            ("shifts", self.load_work_shifts),
+            ("events", self.load_events),
+            ("pending reports", self.run_pending_reports),
+            ("sync", self.sync_all),
+        ]
+        self.central_widget.setEnabled(False)
+        self.status_label.setText("loading session...")
+        STARTUP.mark("build window")
+
+    @property
+    def screenshots(self):
+        if self._screenshots is None:
+            from dailies.screenshots import ScreenshotPipeline
+            self._screenshots = ScreenshotPipeline(self.config["screenshot"],
+                                                   on_done=self.io_signals.screenshot_finished.emit)
+        return self._screenshots
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.hydrated and self.hydration_steps and not STARTUP.finished:
+            STARTUP.mark("show window")
+            QTimer.singleShot(0, self._hydrate_next)
+
+    def _hydrate_next(self):
+        # One step per event-loop turn so the window keeps painting while the session fills in
+        if self.hydration_steps:
+            name, step = self.hydration_steps.pop(0)
+            with STARTUP.phase(name):
+                step()
+            QTimer.singleShot(0, self._hydrate_next)
+            return
+        self.hydrated = True
+        self.central_widget.setEnabled(True)
+        self.status_label.setText("")
+        self.scheduler.enable("prompt", not self.lunch_start)
+        self.scheduler.enable("checkpoint")
+        self.scheduler.enable("worked")
+        self.scheduler.enable("merge")
+        self.scheduler.enable("sync", self.sync is not None)
+        self.rearm_tick()
+        logger.debug("Agent X: Surveillance and time logging timers activated - Hasta la vista, idle time!")
+        STARTUP.finish(self.config["startup_profile_path"])
+        for name, seconds in STARTUP.phases:
+            METRICS.record(f"startup {name}", seconds)
+
+    def show_diagnostics(self):
+        if self.diagnostics is None:
+            self.diagnostics = DiagnosticsDialog(self)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+
+    def dump_metrics(self):
+        path = self.config["metrics_path"]
+        if not path:
+            return None
+        try:
+            METRICS.dump(path, {"scheduler": self.scheduler.stats(),
+                                "startup_ms": {name: round(seconds * 1000, 1) for name, seconds in STARTUP.phases}})
+        except OSError as e:
+            logger.error("Failed to write metrics to %s: %s", path, str(e))
+            return None
+        return path
+
+    def on_tick(self):
+        self.scheduler.tick()
+        self.rearm_tick()
+
+    def rearm_tick(self):
+        delay = self.scheduler.next_delay()
+        if delay is None or self.closing:
+            self.tick_timer.stop()
+        else:
+            self.tick_timer.start(int(delay * 1000))
 
-        self.time_log_timer = QTimer()
-        self.time_log_timer.timeout.connect(self.log_time_note)
-        self.time_log_timer.start(60 * 1000) # 1 minute
+    def set_prompts_enabled(self, enabled):
+        self.scheduler.enable("prompt", enabled)
+        self.rearm_tick()
 
-        self.worked_timer = QTimer()
-        self.worked_timer.timeout.connect(self.update_worked_time)
-        self.worked_timer.start(60 * 1000) # Update every minute
+    def queue_prompt(self):
+        # The prompt is modal; run it after the tick so it never holds up the other jobs
+        QTimer.singleShot(0, self.show_prompt)
 
-        self.update_shift_buttons()
+    def tick_worked_time(self):
+        if not self.clock_in_time or self.lunch_start:
+            return False  # the label does not move while clocked out or at lunch
         self.update_worked_time()
 
-        self.update_event_list()
+    def sync_all(self):
+        self.start_sync(None)
 
-        logger.debug("Agent X: Surveillance and time logging timers activated - Hasta la vista, idle time!")
+    def sync_today(self):
+        # Periodic pass: today plus any other day edited locally since the last sync
+        return self.start_sync([self.today])
+
+    def start_sync(self, dates):
+        if self.sync is None or (self.sync_thread is not None and self.sync_thread.is_alive()):
+            return False
+        self.sync_label.setText("sync: running...")
+        # A daemon thread rather than a pool: a stalled share must never hold up exit
+        self.sync_thread = threading.Thread(target=self._run_sync, args=(dates,), name="Sync", daemon=True)
+        self.sync_thread.start()
+
+    def _run_sync(self, dates):
+        try:
+            result = self.sync.sync(dates)
+        except Exception as e:
+            logger.error("Sync failed: %s", str(e))
+            return
+        self.io_signals.sync_finished.emit(result)
+
+    def on_sync_finished(self, result):
+        when = datetime.fromtimestamp(result.finished).strftime("%H:%M")
+        self.sync_label.setText(f"sync {when}: {result.summary()}")
+        self.sync_label.setStyleSheet("color: orange" if result.error or result.conflicts else "color: gray")
+        for rel in result.conflicts:
+            self.log_ui(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Sync conflict on {rel}, "
+                        f"older copy kept as {os.path.basename(rel)}.conflict")
+        if result.changed_local and not self.closing:
+            # Queued behind the writes already submitted, so a reload never reads a file we are about to rewrite
+            # Each reload hands its own result to its own callback, so back-to-back pulls cannot mix
+            changed = set(result.changed_local)
+            pulled = []
+            self.io_worker.submit("sync reload", lambda: pulled.append(self._read_pulled_today(changed)),
+                                  callback=lambda ok, error: pulled and self._adopt_pulled(changed, *pulled[0]))
+
+    def sync_lock_for(self, path):
+        # The sync thread appends to these two while holding the lock their writers use
+        if path == self.journal.path:
+            return self.journal._lock
+        if path == self.ledger.path:
+            return self.ledger._lock
+        return None
+
+    def _read_pulled_today(self, changed):
+        # Runs on the write queue; returns (notes, spans) for _adopt_pulled, None for what was not pulled
+        notes = self.journal.load() if f"{self.today}/notes.xml" in changed else None
+        spans = read_ledger(self.ledger.path) if f"{self.today}/time.ledger" in changed else None
+        return notes, spans
+
+    def _adopt_pulled(self, changed, pulled_notes, pulled_spans):
+        # Everything is merged in rather than replaced: local state only ever gains what the other
+        # machine recorded, so nothing done here since the pull can be dropped
+        if pulled_notes is not None:
+            known = {note_digest(note) for note in self.notes}
+            added = [note for note in pulled_notes if note_digest(note) not in known]
+            if added:
+                self.notes.extend(added)
+                self.notes.sort(key=lambda note: note.timestamp)
+                self.io_worker.submit("search index", self._index_notes, [note.copy() for note in added])
+        if pulled_spans is not None:
+            known = set(self.ledger.spans)
+            for span in pulled_spans:
+                if span not in known:
+                    self.ledger.add(span)
+        if f"{self.today}/notes.journal" in changed:
+            self.merge_other_writers()
+        if f"{self.today}/shifts.xml" in changed:
+            self.shifts = []
+            self.total_lunches = 0.0
+            self.load_work_shifts()
+            if self.hydrated:
+                self.set_prompts_enabled(not self.lunch_start)
+        event_days = {rel.split("/", 1)[0] for rel in changed if rel.endswith("/events.xml")}
+        if event_days:
+            self.event_writes.flush()
+            for year, month in {month_of(date_str) for date_str in event_days}:
+                self.events.invalidate(year, month)
+            # The calendar caches each visible cell's dots; the pulled days must be painted afresh
+            for date_str in event_days:
+                self.calendar.invalidate_day(date_str)
+            self.on_calendar_page_changed(self.calendar.yearShown(), self.calendar.monthShown())
+            self.update_event_list()
+
+    def ensure_session_dir(self):
+        os.makedirs(self.session_dir, exist_ok=True)
+        logger.debug("Agent X: Base of operations established at %s - The Force is strong with this one!",
+                     self.session_dir)
 
     def load_events(self):
-        self.events = {}
-        for date_dir in os.listdir(BASE_DIR):
-            if len(date_dir) == 10 and date_dir.count('-') == 2: # Basic check for YYYY-MM-DD format
-                session_dir = os.path.join(BASE_DIR, date_dir)
-                events_file = os.path.join(session_dir, "events.xml")
-                if os.path.exists(events_file):
-                    try:
-                        tree = ET.parse(events_file)
-                        root = tree.getroot()
-                        event_list = [{'text': event.text.strip(), 'complete': event.get("complete", "false").lower() == "true", 'color': event.get("color", "#FFFFFF")}
-                                      for event in root.findall("event") if event.text and event.text.strip()]
-                        if event_list:
-                            self.events[date_dir] = event_list
-                            logger.info("Loaded events from %s", events_file)
-                    except ET.ParseError:
-                        logger.error("Failed to parse events.xml for %s", date_dir)
+        self.on_calendar_page_changed(self.calendar.yearShown(), self.calendar.monthShown())
+        self.update_event_list()
+
+    def load_event_month(self, year, month):
+        try:
+            return self.session_index.month_events(BASE_DIR, year, month)
+        except OSError as e:
+            logger.error("Failed to load events for %04d-%02d: %s", year, month, str(e))
+            return {}
+
+    def on_calendar_page_changed(self, year, month):
+        # Loading a month may index it (a SQLite write), so even the visible page loads on the prefetch
+        # thread; its cells get their dots when on_event_month_loaded repaints
+        self.events.prefetch(year, month)
+        # The grid shows spill-over days from both neighbours, and they are the likeliest next pages
+        for adj_year, adj_month in adjacent_months(year, month):
+            self.events.prefetch(adj_year, adj_month)
+        self.calendar.update()
+
+    def on_event_month_loaded(self, year, month):
+        self.calendar.update()
+        selected = self.calendar.selectedDate()
+        if ((selected.year(), selected.month()) == (year, month)
+                and self.event_model.date_str != selected.toString("yyyy-MM-dd")):
+            self.update_event_list()
 
     def save_events(self, date_str):
-        event_list = self.events.get(date_str, [])
-        session_dir = os.path.join(BASE_DIR, date_str)
-        os.makedirs(session_dir, exist_ok=True)
-        events_file = os.path.join(session_dir, "events.xml")
-        if event_list:
-            root = ET.Element("events")
-            for event in event_list:
-                event_elem = ET.SubElement(root, "event")
-                event_elem.set("complete", "true" if event['complete'] else "false")
-                event_elem.set("color", event.get('color', "#FFFFFF"))
-                event_elem.text = event['text']
-            tree = ET.ElementTree(root)
-            tree.write(events_file, encoding="utf-8", xml_declaration=True)
-            logger.info("Saved events to %s", events_file)
+        if date_str == self.event_model.date_str:
+            # The model's list is the one being edited, even if its month was evicted and re-read meanwhile
+            self._adopt_model_events()
+            source = self.event_model.events
         else:
-            if os.path.exists(events_file):
-                os.remove(events_file)
-            logger.info("Removed empty events.xml for %s", date_str)
+            source = self.events.get(date_str, [])
+        event_list = [dict(event) for event in source]
+        session_dir = os.path.join(BASE_DIR, date_str)
+        self.io_worker.submit(f"events {date_str}", self._write_events, session_dir, date_str, event_list)
+
+    @METRICS.measure("save_events")
+    def _write_events(self, session_dir, date_str, event_list):
+        write_events_xml(session_dir, date_str, event_list)
+        self.session_index.update_events(date_str, session_dir, event_list)
+        if self.sync is not None:
+            self.sync.mark_dirty(date_str)
+
+    def show_search(self):
+        if self.search_dialog is None:
+            self.search_dialog = SearchDialog(self)
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.activateWindow()
+
+    def refresh_search_index(self):
+        # Re-reads only days whose directory changed since the last refresh, so after the first build
+        # this is a stat per day.
+        if self.search_indexing:
+            return
+        self.search_indexing = True
+        self.index_executor.submit(self._refresh_search_index)
+
+    def _refresh_search_index(self):
+        try:
+            self.session_index.refresh(BASE_DIR)
+        except (OSError, sqlite3.Error) as e:
+            logger.error("Failed to refresh the search index: %s", str(e))
+        self.io_signals.index_refreshed.emit()
+
+    def on_search_index_refreshed(self):
+        self.search_indexing = False
+        if self.search_dialog is not None and self.search_dialog.isVisible():
+            self.search_dialog.run_search()
+
+    def jump_to_day(self, date_str):
+        self.calendar.setSelectedDate(QDate.fromString(date_str, "yyyy-MM-dd"))
+        self.calendar.showSelectedDate()
+        self.raise_()
+        self.activateWindow()
 
     def update_event_list(self):
         date_str = self.calendar.selectedDate().toString("yyyy-MM-dd")
-        events = self.events.get(date_str, [])
-        self.event_list.clear()
-        for idx, event in enumerate(events):
-            item = QListWidgetItem()
-            widget = EventItemWidget(event['text'], event['complete'], event.get('color', '#FFFFFF'))
-            widget.complete_changed.connect(lambda checked, i=idx: self.update_event_complete(date_str, i, checked))
-            widget.text_changed.connect(lambda text, i=idx: self.update_event_text(date_str, i, text))
-            widget.color_changed.connect(lambda col, i=idx: self.update_event_color(date_str, i, col))
-            self.event_list.addItem(item)
-            self.event_list.setItemWidget(item, widget)
-            item.setSizeHint(widget.sizeHint())
-
-    def update_event_complete(self, date_str, idx, checked):
-        if date_str in self.events:
-            self.events[date_str][idx]['complete'] = checked
-            self.save_events(date_str)
-
-    def update_event_text(self, date_str, idx, text):
-        if date_str in self.events:
-            self.events[date_str][idx]['text'] = text.strip()
-            self.save_events(date_str)
-
-    def update_event_color(self, date_str, idx, color):
-        if date_str in self.events:
-            self.events[date_str][idx]['color'] = color
-            self.save_events(date_str)
+        if self.event_model.date_str != date_str and self.event_model.date_str in self.event_writes.dirty:
+            # Pending edits are saved from the model's list while it still holds that day
+            self.event_writes.flush()
+        if not self.events.is_loaded(*month_of(date_str)):
+            # Shown by on_event_month_loaded; until then the list is empty and has no day to edit
+            self.events.prefetch(*month_of(date_str))
+            self.event_model.set_day("", [])
+            return
+        self.event_model.set_day(date_str, self.events.get(date_str, []))
+
+    def _adopt_model_events(self):
+        # Puts the model's list back into the store when the month cache dropped it or re-read the month
+        date_str, events = self.event_model.date_str, self.event_model.events
+        if not date_str:
+            return
+        if events:
+            if self.events.get(date_str) is not events:
+                self.events[date_str] = events
+        elif date_str in self.events:
+            del self.events[date_str]
+
+    def on_event_edited(self, date_str, role):
+        self._adopt_model_events()
+        self.event_writes.mark_dirty(date_str)
+        if role == EventListModel.ColorRole:
+            self.calendar.invalidate_day(date_str)
 
     def add_event(self):
         date_str = self.calendar.selectedDate().toString("yyyy-MM-dd")
         text, ok = QInputDialog.getText(self, "Add Event", "Enter event text:")
         if ok and text.strip():
-            if date_str not in self.events:
-                self.events[date_str] = []
-            self.events[date_str].append({'text': text.strip(), 'complete': False, 'color': '#FFFFFF'})
-            self.save_events(date_str)
-            qdate = QDate.fromString(date_str, "yyyy-MM-dd")
-            self.calendar.event_dates.add(qdate)
-            self.calendar.update()
-            self.update_event_list()
+            if self.event_model.date_str != date_str:
+                # Quicker than the prefetch: wait for the month so the day's saved events are kept
+                self.events.month(*month_of(date_str))
+                self.update_event_list()
+            self.event_model.append_event({'text': text.strip(), 'complete': False, 'color': '#FFFFFF'})
+            self._adopt_model_events()
+            self.event_writes.mark_dirty(date_str)
+            self.calendar.invalidate_day(date_str)
 
     def delete_event(self):
-        current_row = self.event_list.currentRow()
-        if current_row < 0:
+        index = self.event_list.currentIndex()
+        if not index.isValid():
             return
-        date_str = self.calendar.selectedDate().toString("yyyy-MM-dd")
-        if date_str in self.events:
-            del self.events[date_str][current_row]
-            if not self.events[date_str]:
-                del self.events[date_str]
-                qdate = QDate.fromString(date_str, "yyyy-MM-dd")
-                self.calendar.event_dates.discard(qdate)
-                self.calendar.update()
-            self.save_events(date_str)
-            self.update_event_list()
+        date_str = self.event_model.date_str
+        self.event_model.remove_event(index.row())
+        self._adopt_model_events()
+        self.event_writes.mark_dirty(date_str)
+        self.calendar.invalidate_day(date_str)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.ActivationChange and not self.isActiveWindow():
+            self.event_writes.flush()
 
     def calc_button_clicked(self):
         button = self.sender()
@@ -440,21 +951,7 @@ border-right: 1px solid black;\
     def set_subtask(self, subtask):
         self.current_subtask = subtask.strip()
 
-    def load_recent_subtasks(self):
-        subtasks = []
-        note_filename_xml = os.path.join(self.session_dir, "notes.xml")
-        if os.path.exists(note_filename_xml):
-            try:
-                tree = ET.parse(note_filename_xml)
-                root = tree.getroot()
-                for note in sorted(root.findall("note"), key=lambda n: n.get("timestamp"), reverse=True):
-                    subtask = note.get("subtask")
-                    if subtask and subtask not in subtasks:
-                        subtasks.append(subtask)
-                    if len(subtasks) == 10:
-                        break
-            except ET.ParseError:
-                logger.error("Failed to parse notes.xml for subtasks")
+    def load_recent_subtasks(self, subtasks):
         for subtask in subtasks:
             self.subtask_combo.addItem(subtask)
 
@@ -503,7 +1000,7 @@ border-right: 1px solid black;\
         self.lunch_start = now.timestamp()
         self.shifts.append({"type": "lunch_out", "timestamp": now.strftime("%H:%M:%S")})
         self.update_shifts_file()
-        self.prompt_timer.stop() # Disable prompts during lunch
+        self.set_prompts_enabled(False) # Disable prompts during lunch
         self.save_to_task("default", f"LUNCH BREAK STARTED at {now.strftime('%H:%M:%S')}")
         self.update_shift_status()
         self.update_shift_buttons()
@@ -519,7 +1016,7 @@ border-right: 1px solid black;\
         self.total_lunches += elapsed
         self.shifts.append({"type": "lunch_in", "timestamp": now.strftime("%H:%M:%S"), "duration": elapsed})
         self.update_shifts_file()
-        self.prompt_timer.start(15 * 60 * 1000) # Re-enable prompts
+        self.set_prompts_enabled(True) # Re-enable prompts
         self.save_to_task("default", f"LUNCH BREAK ENDED at {now.strftime('%H:%M:%S')} (Duration: {elapsed:.1f} min)")
         self.lunch_start = None
         self.update_shift_status()
@@ -559,64 +1056,52 @@ border-right: 1px solid black;\
 
     def load_work_shifts(self):
         shifts_filename = os.path.join(self.session_dir, "shifts.xml")
-        if os.path.exists(shifts_filename):
-            try:
-                tree = ET.parse(shifts_filename)
-                root = tree.getroot()
+        is_clocked_in = False
+        is_on_lunch = False
+        for shift in read_shifts_xml(shifts_filename):
+            shift_type = shift["type"]
+            timestamp = shift["timestamp"]
+            self.shifts.append(shift)
+            if shift_type == "work_in":
+                is_clocked_in = True
+                self.clock_in_time = datetime.strptime(f"{self.today} {timestamp}", "%Y-%m-%d %H:%M:%S").timestamp()
+                self.clock_in_display_time = timestamp[:5] # HH:MM
+            elif shift_type == "work_out":
                 is_clocked_in = False
+            elif shift_type == "lunch_out":
+                is_on_lunch = True
+                if is_clocked_in and is_on_lunch:
+                    self.lunch_start = datetime.strptime(f"{self.today} {timestamp}", "%Y-%m-%d %H:%M:%S").timestamp()
+            elif shift_type == "lunch_in":
                 is_on_lunch = False
-                for shift in root.findall("shift"):
-                    shift_type = shift.get("type")
-                    timestamp = shift.get("timestamp")
-                    duration = float(shift.get("duration", 0))
-                    worked = float(shift.get("worked", 0))
-                    self.shifts.append({"type": shift_type, "timestamp": timestamp, "duration": duration, "worked": worked})
-                    if shift_type == "work_in":
-                        is_clocked_in = True
-                        self.clock_in_time = datetime.strptime(f"{self.today} {timestamp}", "%Y-%m-%d %H:%M:%S").timestamp()
-                        self.clock_in_display_time = timestamp[:5] # HH:MM
-                    elif shift_type == "work_out":
-                        is_clocked_in = False
-                    elif shift_type == "lunch_out":
-                        is_on_lunch = True
-                        if is_clocked_in and is_on_lunch:
-                            self.lunch_start = datetime.strptime(f"{self.today} {timestamp}", "%Y-%m-%d %H:%M:%S").timestamp()
-                    elif shift_type == "lunch_in":
-                        is_on_lunch = False
-                        self.total_lunches += duration
-                if not is_clocked_in:
-                    self.clock_in_time = None
-                    self.clock_in_display_time = None
-                if not is_on_lunch:
-                    self.lunch_start = None
-                logger.info("Loaded %d shifts from %s", len(self.shifts), shifts_filename)
-            except ET.ParseError:
-                logger.error("Failed to parse shifts.xml")
+                self.total_lunches += shift["duration"]
+        if not is_clocked_in:
+            self.clock_in_time = None
+            self.clock_in_display_time = None
+        if not is_on_lunch:
+            self.lunch_start = None
+        if self.shifts:
+            logger.info("Loaded %d shifts from %s", len(self.shifts), shifts_filename)
         self.update_shift_status()
         self.update_shift_buttons()
         self.update_worked_time()
-        if self.lunch_start:
-            self.prompt_timer.stop() # Disable if loaded on lunch
 
     def update_shifts_file(self):
-        shifts_filename = os.path.join(self.session_dir, "shifts.xml")
-        with open(shifts_filename, "w") as f:
-            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<shifts date="{self.today}">\n')
-            for s in self.shifts:
-                duration = s.get("duration", 0)
-                worked = s.get("worked", 0)
-                f.write(f' <shift type="{s["type"]}" timestamp="{s["timestamp"]}" duration="{duration}" worked="{worked}"></shift>\n')
-            f.write('</shifts>\n')
-        logger.info("Updated shifts XML: %s", shifts_filename)
+        shifts = [dict(s) for s in self.shifts]
+        self.io_worker.submit("shifts", self._write_shifts, shifts)
+
+    @METRICS.measure("update_shifts_file")
+    def _write_shifts(self, shifts):
+        write_shifts_xml(self.session_dir, self.today, shifts)
 
     def set_task(self, task):
-        if self.current_task_start:
-            elapsed = (time.time() - self.current_task_start) / 60.0
-            self.task_times[self.current_task] += elapsed
-            logger.debug("Agent X: Logged %.1f minutes for %s - Time Lord approves!", elapsed, self.current_task)
+        span = self.ledger.switch(task, self.current_subtask, time.time(), credit_subtask=self.current_subtask)
+        self.record_span(span)
+        if span and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Agent X: Logged %.1f minutes for %s - Time Lord approves!", (span[3] - span[2]) / 60.0,
+                         span[0])
 
         self.current_task = task
-        self.current_task_start = time.time()
         for btn_task, btn in self.task_buttons.items():
             btn.setStyleSheet(
                 f"background-color: {self.task_colors[btn_task]['bg']}; color: {self.task_colors[btn_task]['fg']}")
@@ -625,6 +1110,8 @@ border-right: 1px solid black;\
         logger.debug("Agent X: Mission target switched to %s - Engage warp speed!", task)
 
     def show_prompt(self):
+        if self.closing:
+            return
         self.raise_()
         self.activateWindow()
         QMessageBox.information(self, "Note Time", "Time to add a note and take a screenshot!")
@@ -633,7 +1120,7 @@ border-right: 1px solid black;\
         QTimer.singleShot(3 * 60 * 1000, self.check_prompt_timeout)
 
     def check_prompt_timeout(self):
-        if self.prompt_active and not self.note_text.toPlainText().strip():
+        if self.prompt_active and not self.closing and not self.note_text.toPlainText().strip():
             self.save_auto_note()
             logger.debug("Agent X: Operative gone dark - Deploying auto-note protocol, Batman style!")
 
@@ -651,34 +1138,30 @@ border-right: 1px solid black;\
         self.save_to_task("default", auto_note)
         self.prompt_active = False
 
+    @METRICS.measure("save_to_task")
     def save_to_task(self, task, note):
         task_dir = os.path.join(self.session_dir, task)
-        os.makedirs(task_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%H:%M:%S")
+        subtask = self.current_subtask
 
-        if self.current_task_start:
-            elapsed = (time.time() - self.current_task_start) / 60.0
-            self.task_times[task] += elapsed
-            logger.debug("Agent X: Logged %.1f minutes for %s - Time logged, Spock says 'Fascinating!'", elapsed, task)
-            self.current_task_start = time.time()
+        # The note describes the work since the last one, so that span is credited to the note's task/subtask
+        span = self.ledger.switch(self.current_task, subtask, time.time(), credit_task=task, credit_subtask=subtask)
+        self.record_span(span)
+        if span and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Agent X: Logged %.1f minutes for %s - Time logged, Spock says 'Fascinating!'",
+                         (span[3] - span[2]) / 60.0, task)
 
-        subtask = self.current_subtask
         if subtask and subtask not in [self.subtask_combo.itemText(i) for i in range(self.subtask_combo.count())]:
             self.subtask_combo.insertItem(0, subtask)
             if self.subtask_combo.count() > 10:
                 self.subtask_combo.removeItem(10)
 
-        self.notes.append({"task": task, "timestamp": timestamp, "content": note, "subtask": subtask})
-        self.update_notes_files()
+        note_record = Note(task, timestamp, note, subtask)
+        self.append_note(note_record)
 
-        try:
-            screenshot = pyautogui.screenshot()
-            screenshot_filename = os.path.join(task_dir, f"screenshot_{task}_{timestamp.replace(':', '-')}.png")
-            screenshot.save(screenshot_filename)
-            logger.info("Screenshot saved: %s - Captured the moment, Indiana Jones style!", screenshot_filename)
-        except Exception as e:
-            QMessageBox.warning(self, "Screenshot Failed", f"Note saved but screenshot failed: {str(e)}")
-            logger.error("Screenshot failed: %s - Gremlins ate the screenshot!", str(e))
+        # The note is acknowledged now; capture and encoding finish on the screenshot pool
+        self.screenshots.submit(os.path.join(task_dir, f"screenshot_{task}_{timestamp.replace(':', '-')}"),
+                                note_record)
 
         self.note_text.clear()
         self.status_label.setText("note saved!")
@@ -689,129 +1172,100 @@ border-right: 1px solid black;\
         subtask_str = f" /{subtask}" if subtask else ""
         self.log_ui(f"{now.strftime('%Y-%m-%d %H:%M:%S')} - Note saved in [{task}{subtask_str}]")
 
+    def on_screenshot_finished(self, note, path, error):
+        if error:
+            if self.closing:
+                logger.error("Screenshot failed during close: %s", error)
+                return
+            QMessageBox.warning(self, "Screenshot Failed", f"Note saved but screenshot failed: {error}")
+            return
+        rel_path = os.path.relpath(path, self.session_dir).replace(os.sep, "/")
+        note.screenshot = rel_path
+        self.io_worker.submit("screenshot", self._journal_screenshot, note.copy(), rel_path)
+
     def load_existing_notes(self):
-        note_filename_xml = os.path.join(self.session_dir, "notes.xml")
-        self.notes = []
-        if os.path.exists(note_filename_xml):
+        # One read of notes.xml + journal feeds the notes, task totals, shutdown gap and subtask list
+        session = self.journal.load_session()
+        self.notes = session.notes
+        self.ledger.load(self.today, self.notes, time.time())
+        logger.info("Loaded %d notes from %s - The archives are complete, Obi-Wan!", len(self.notes),
+                    self.session_dir)
+        if self.journal.needs_compaction():
+            self.journal.compact_async()
+        now = time.time()
+        self.check_last_shutdown(session.last_shutdown, now)
+        self.ledger.start(self.current_task, self.current_subtask, now)
+        self.load_recent_subtasks(session.recent_subtasks)
+
+    def check_last_shutdown(self, last_shutdown, now):
+        if last_shutdown:
             try:
-                tree = ET.parse(note_filename_xml)
-                root = tree.getroot()
-                for note in root.findall("note"):
-                    task = note.get("task")
-                    timestamp = note.get("timestamp")
-                    subtask = note.get("subtask", "")
-                    content = note.text if note.text is not None else ""
-                    self.notes.append({"task": task, "timestamp": timestamp, "subtask": subtask, "content": content})
-                    if content.startswith("Time logged:"):
-                        try:
-                            minutes = float(content.split(" ")[2])
-                            self.task_times[task] += minutes
-                        except (IndexError, ValueError):
-                            logger.error("Failed to parse time from note: %s - Time travel glitch detected!", content)
-                logger.info("Loaded %d notes from %s - The archives are complete, Obi-Wan!", len(self.notes),
-                            note_filename_xml)
-            except ET.ParseError:
-                logger.error("Failed to parse existing notes.xml - XML chaos, Serenity now!")
-
-    def check_last_shutdown(self):
-        note_filename_xml = os.path.join(self.session_dir, "notes.xml")
-        if os.path.exists(note_filename_xml):
-            try:
-                tree = ET.parse(note_filename_xml)
-                root = tree.getroot()
-                shutdown_notes = [n for n in root.findall("note") if "the program shut down at" in (n.text or "")]
-                if shutdown_notes:
-                    last_shutdown_note = shutdown_notes[-1]
-                    last_shutdown = last_shutdown_note.text.split("at ")[1]
-                    logger.info("Last shutdown: %s - Found the last log, Sherlock!", last_shutdown)
-                    shutdown_dt = datetime.strptime(last_shutdown, "%Y-%m-%d %H:%M:%S")
-                    if shutdown_dt.strftime("%Y-%m-%d") == self.today:
-                        gap_minutes = (time.time() - shutdown_dt.timestamp()) / 60.0
-                        self.task_times["default"] += gap_minutes
+                logger.info("Last shutdown: %s - Found the last log, Sherlock!", last_shutdown)
+                shutdown_dt = datetime.strptime(last_shutdown, "%Y-%m-%d %H:%M:%S")
+                if shutdown_dt.strftime("%Y-%m-%d") == self.today:
+                    span = self.ledger.bridge_gap(shutdown_dt.timestamp(), now)
+                    if span:
+                        self.record_span(span)
                         logger.debug("Added %.1f minutes to default for gap - Time gap bridged, Doctor Who style!",
-                                     gap_minutes)
-            except (ET.ParseError, ValueError) as e:
+                                     (span[3] - span[2]) / 60.0)
+            except (IndexError, ValueError) as e:
                 logger.error("Failed to parse shutdown time: %s - Time vortex malfunction!", str(e))
         else:
             logger.info("No previous shutdown note found - Fresh start, Neo!")
 
-    def log_time_note(self):
-        if self.current_task_start:
-            elapsed = (time.time() - self.current_task_start) / 60.0
-            task = self.current_task
-            self.task_times[task] += elapsed
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            note_content = f"Time logged: {elapsed:.1f} minutes for {task}"
-            self.notes.append({"task": task, "timestamp": timestamp, "content": note_content, "subtask": ""})
-            self.update_notes_files()
-            logger.debug("Agent X: Auto-logged %.1f minutes for %s - Time tracked, Tony Stark approved!", elapsed, task)
-            self.current_task_start = time.time()
-
-    def update_notes_files(self):
-        note_filename_xml = os.path.join(self.session_dir, "notes.xml")
-        note_filename_html = os.path.join(self.session_dir, "notes.html")
-
-        # Load existing notes from XML to merge with current session
-        existing_notes = []
-        if os.path.exists(note_filename_xml):
-            try:
-                tree = ET.parse(note_filename_xml)
-                root = tree.getroot()
-                for note in root.findall("note"):
-                    existing_notes.append({
-                        "task": note.get("task"),
-                        "timestamp": note.get("timestamp"),
-                        "subtask": note.get("subtask", ""),
-                        "content": note.text if note.text is not None else ""
-                    })
-                logger.debug("Agent X: Retrieved %d existing notes from XML - Memory banks loaded, R2-D2!",
-                             len(existing_notes))
-            except ET.ParseError:
-                logger.error("Agent X: Failed to parse notes.xml for merging - XML rebellion detected!")
-
-        # Merge existing notes with new ones, avoiding duplicates
-        all_notes = existing_notes + self.notes
-        # Remove duplicates based on task, timestamp, subtask, and content
-        unique_notes = []
-        seen = set()
-        for note in all_notes:
-            note_key = (note["task"], note["timestamp"], note["subtask"], note["content"])
-            if note_key not in seen:
-                seen.add(note_key)
-                unique_notes.append(note)
-        logger.debug("Agent X: Merged to %d unique notes - Duplicates zapped, Ghostbusters style!", len(unique_notes))
-
-        # Write to HTML
-        with open(note_filename_html, "w") as f:
-            f.write('<html><head><style>')
-            f.write('body { font-family: Arial, sans-serif; margin: 20px; }')
-            f.write('h2 { color: #666; }')
-            f.write('.note { margin: 5px 0; padding: 10px; border-radius: 4px; }')
-            for task_name, colors in self.task_colors.items():
-                f.write(f'.note-{task_name} {{ background: {colors["bg"]}; color: {colors["fg"]}; }}')
-            f.write('@media (max-width: 600px) { .note { padding: 8px; font-size: 14px; } }')
-            f.write(f'</style></head><body>\n<h2>Notes for {self.today}</h2>\n')
-            for n in unique_notes:
-                if not n["content"].startswith("Time logged:"):
-                    subtask_str = f" /{n['subtask']}" if n['subtask'] else ""
-                    f.write(
-                        f'<div class="note note-{n["task"]}" data-task="{n["task"]}"><p><strong>{n["timestamp"]}</strong> [{n["task"]}{subtask_str}]: {n["content"]}</p></div>\n')
-            f.write('</body></html>\n')
-        logger.info("Updated HTML file with %d notes: %s - HTML updated, Spider-Man swings in!", len(unique_notes),
-                    note_filename_html)
-
-        # Write to XML
-        with open(note_filename_xml, "w") as f:
-            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<notes date="{self.today}">\n')
-            for n in unique_notes:
-                subtask_attr = f' subtask="{n["subtask"]}"' if n["subtask"] else ""
-                f.write(f' <note task="{n["task"]}" timestamp="{n["timestamp"]}"{subtask_attr}>{n["content"]}</note>\n')
-            f.write('</notes>\n')
-        logger.info("Updated XML file with %d notes: %s - XML locked, Vault 101 secure!", len(unique_notes),
-                    note_filename_xml)
-
-        # Update in-memory notes to reflect the full set
-        self.notes = unique_notes
+    def checkpoint_time(self):
+        # Persist the running span so a crash loses at most one flush interval; no note is written for it
+        span = self.ledger.open_span(time.time())
+        if not span:
+            return False
+        self.io_worker.submit("time checkpoint", self.ledger.write_checkpoint, span)
+
+    def record_span(self, span):
+        if span:
+            self.io_worker.submit("time ledger", self.ledger.write_span, span)
+
+    def append_note(self, note):
+        self.notes.append(note)
+        self.io_worker.submit("note", self._journal_note, note.copy())
+
+    def merge_other_writers(self):
+        # Another instance may be writing the same day; pick up only what it appended since last time
+        if self.closing or not self.journal.has_unread_tail():
+            return False
+        self.io_worker.submit("journal merge", self.journal.pull_tail,
+                              callback=lambda ok, error: self._adopt_merged_notes())
+
+    def _adopt_merged_notes(self):
+        records = self.journal.take_merged()
+        if not records:
+            return
+        before = len(self.notes)
+        replay_journal(self.notes, records)
+        if len(self.notes) > before:
+            self.io_worker.submit("search index", self._index_notes, [note.copy() for note in self.notes[before:]])
+            self.log_ui(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Merged {len(self.notes) - before} "
+                        f"notes from another instance")
+
+    @METRICS.measure("note_write")
+    def _journal_note(self, note):
+        if self.journal.append(note):
+            self.journal.compact_async()
+        self.session_index.add_note(self.today, note)
+
+    def _index_notes(self, notes):
+        for note in notes:
+            self.session_index.add_note(self.today, note)
+
+    def _journal_screenshot(self, note, rel_path):
+        if self.journal.attach_screenshot(note, rel_path):
+            self.journal.compact_async()
+
+    def on_write_finished(self, label, ok, error, callback):
+        if not ok:
+            self.status_label.setText(f"save failed: {label}")
+            self.log_ui(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Failed to save {label}: {error}")
+        if callback is not None and not self.closing:
+            callback(ok, error)
 
     def generate_report(self, report_date=None, session_dir=None, notes=None, task_times=None, shifts=None, total_lunches=0.0):
         if report_date is None:
@@ -821,277 +1275,216 @@ border-right: 1px solid black;\
         if notes is None:
             notes = self.notes
         if task_times is None:
-            task_times = self.task_times
+            # Totals include the running span up to now without closing it
+            task_times = {task: 0.0 for task in self.task_colors}
+            task_times.update(self.ledger.totals(time.time()))
         if shifts is None:
             shifts = self.shifts
         if total_lunches == 0.0:
             total_lunches = self.total_lunches
 
-        if self.current_task_start and notes is self.notes:
-            elapsed = (time.time() - self.current_task_start) / 60.0
-            self.task_times[self.current_task] += elapsed
-            logger.debug("Agent X: Logged %.1f minutes for %s before report - Time logged, Captain Kirk out!", elapsed,
-                         self.current_task)
-            self.current_task_start = time.time()
-
-        report_filename_html = os.path.join(session_dir, f"report_{report_date}.html")
-        with open(report_filename_html, "w") as report:
-            report.write('<!DOCTYPE html>\n<html><head>')
-            report.write('<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>')
-            report.write('<style>')
-            report.write('body { font-family: Arial, sans-serif; margin: 20px; background: #f9f9f9; }')
-            report.write('h1 { color: #2c3e50; } h2 { color: #34495e; } h3 { color: #7f8c8d; }')
-            report.write('.note { margin: 5px 0; padding: 10px; border-radius: 4px; }')
-            for task_name, colors in self.task_colors.items():
-                report.write(f'.note-{task_name} {{ background: {colors["bg"]}; color: {colors["fg"]}; }}')
-            report.write('.task-group { margin-bottom: 25px; padding: 10px; background: #ecf0f1; border-radius: 8px; }')
-            report.write('.summary { border-collapse: collapse; width: 50%; margin-top: 20px; }')
-            report.write('.summary td, .summary th { border: 1px solid #ddd; padding: 8px; text-align: left; }')
-            report.write('.summary th { background: #3498db; color: white; }')
-            report.write('#timeChart { max-width: 500px; margin: 20px auto; }')
-            report.write('@media (max-width: 600px) { .note { padding: 8px; font-size: 14px; } }')
-            report.write('</style></head><body>\n<h1>Daily Report</h1>\n')
-            self._write_html_report(report, report_date, notes, task_times, session_dir)
-            report.write('<h2>Time Breakdown</h2>\n')
-            report.write('<canvas id="timeChart"></canvas>\n')
-            report.write('<script>\n')
-            report.write('const ctx = document.getElementById("timeChart").getContext("2d");\n')
-            report.write('const timeChart = new Chart(ctx, {\n')
-            report.write(' type: "pie",\n')
-            report.write(' data: {\n')
-            report.write(' labels: [')
-            labels = [f'"{task.capitalize()}"' for task in self.task_colors.keys()]
-            report.write(', '.join(labels) + '],\n')
-            report.write(' datasets: [{\n')
-            report.write(' data: [')
-            times = [f'{task_times[task]:.1f}' for task in self.task_colors.keys()]
-            report.write(', '.join(times) + '],\n')
-            report.write(' backgroundColor: [')
-            colors = [f'"{self.task_colors[task]["bg"]}"' for task in self.task_colors.keys()]
-            report.write(', '.join(colors) + '],\n')
-            report.write(' borderColor: "#fff",\n')
-            report.write(' borderWidth: 2\n')
-            report.write(' }]\n')
-            report.write(' },\n')
-            report.write(' options: {\n')
-            report.write(' responsive: true,\n')
-            report.write(' plugins: {\n')
-            report.write(' legend: { position: "top" },\n')
-            report.write(' tooltip: {\n')
-            report.write(' callbacks: {\n')
-            report.write(' label: function(context) {\n')
-            report.write(' let label = context.label || "";\n')
-            report.write(' if (label) label += ": ";\n')
-            report.write(' label += context.raw + " minutes";\n')
-            report.write(' return label;\n')
-            report.write(' }\n')
-            report.write(' }\n')
-            report.write(' }\n')
-            report.write(' }\n')
-            report.write(' }\n')
-            report.write('});\n')
-            report.write('</script>\n')
-
-            # Add shift summary
-            report.write('<h2>Shift Summary</h2>\n')
-            report.write('<table class="summary">\n')
-            report.write('<tr><th>Metric</th><th>Value</th></tr>\n')
-            total_worked = sum(s.get("worked", 0) for s in shifts if s["type"] == "work_out")
-            report.write(f'<tr><td>Total Worked</td><td>{format_minutes(total_worked)}</td></tr>\n')
-            report.write(f'<tr><td>Total Lunch Time</td><td>{format_minutes(total_lunches)}</td></tr>\n')
-            report.write('</table>\n')
-
-            report.write('</body></html>\n')
-        logger.info("Generated HTML report with pie chart: %s - Report beamed up, Scotty!", report_filename_html)
-        webbrowser.open(f"file://{report_filename_html}")
-
-        report_filename_xml = os.path.join(session_dir, f"report_{report_date}.xml")
-        with open(report_filename_xml, "w") as report:
-            report.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<report date="{report_date}">\n')
-            self._write_xml_report(report, report_date, notes, task_times, session_dir)
-            report.write('</report>\n')
-        logger.info("Generated XML report: %s - XML dispatched, Agent 007!", report_filename_xml)
+        # Snapshot everything the worker thread reads so later edits can't race the report
+        events = [dict(event) for event in self.events.get(report_date, [])]
+        from dailies.reports import write_day_report
+        self.io_worker.submit(f"report {report_date}", write_day_report, session_dir, report_date,
+                              list(notes), dict(task_times), [dict(s) for s in shifts], total_lunches, events,
+                              self.task_colors, self.tasks,
+                              callback=lambda ok, error: self._on_report_written(ok, report_date, session_dir))
+
+    def view_notes(self):
+        # Queued behind any pending journal writes, so the page includes the note just saved
+        self.io_worker.submit("notes.html", self.journal.render_html,
+                              callback=lambda ok, error: self._on_notes_rendered(ok))
+
+    def _on_notes_rendered(self, ok):
+        if not ok:
+            QMessageBox.warning(self, "Notes Failed", "Could not render notes.html.")
+            return
+        import webbrowser
+        webbrowser.open(f"file://{self.journal.html_path}")
 
+    def _on_report_written(self, ok, report_date, session_dir):
+        if not ok:
+            QMessageBox.warning(self, "Report Failed", f"Could not write the report for {report_date}.")
+            return
+        import webbrowser
+        webbrowser.open(f"file://{os.path.join(session_dir, f'report_{report_date}.html')}")
         QMessageBox.information(self, "Report Generated", f"Reports saved in HTML and XML formats in {session_dir}")
         logger.debug("Agent X: Debriefing complete - Reports dispatched to %s, mission accomplished!", session_dir)
 
-    def _write_html_report(self, report, report_date, notes, task_times, session_dir):
-        report.write(f'<h2>Date: {report_date}</h2>\n')
-        total_time = 0
-        afk_time = 0
-        all_tasks = self.tasks + ["default"]
-
-        for task in all_tasks:
-            task_notes = [n for n in notes if n["task"] == task and not n["content"].startswith("Time logged:")]
-            if task_notes:
-                report.write(f'<div class="task-group">\n<h3>{task.upper()}</h3>\n<ul>\n')
-                for note in task_notes:
-                    subtask_str = f" /{note['subtask']}" if note.get('subtask') else ""
-                    report.write(
-                        f'<li><div class="note note-{task}"><strong>{note["timestamp"]}</strong> [{task}{subtask_str}]: {note["content"]}</div></li>\n')
-
-                task_time = task_times[task]
-                if task == "default" and any("auto-note" in n["content"] for n in notes if n["task"] == task):
-                    afk_time += task_time
-                else:
-                    total_time += task_time
-
-                report.write(f'</ul>\n<p>Tracked Time: {task_time:.1f} minutes</p>\n')
-                task_dir = os.path.join(session_dir, task)
-                if os.path.exists(task_dir):
-                    screenshots = [f for f in os.listdir(task_dir) if f.startswith(f"screenshot_{task}")]
-                    if screenshots:
-                        report.write('<p>Screenshots:</p>\n<ul>\n')
-                        for shot in screenshots:
-                            report.write(f'<li><a href="{task}/{shot}">{shot}</a></li>\n')
-                        report.write('</ul>\n')
-                        logger.debug("Agent X: Found %d screenshots for %s - Say cheese, Shutterbug!", len(screenshots),
-                                     task)
-                    else:
-                        logger.debug("Agent X: No screenshots for %s - The camera shy task strikes again!", task)
-                else:
-                    logger.debug("Agent X: No directory for %s - This task is a ghost, Scooby-Doo!", task)
-                report.write('</div>\n')
-
-        report.write('<table class="summary">\n')
-        report.write('<tr><th>Metric</th><th>Value</th></tr>\n')
-        report.write(f'<tr><td>Total Productive Time</td><td>{total_time:.1f} minutes</td></tr>\n')
-        report.write(f'<tr><td>Total AFK Time</td><td>{afk_time:.1f} minutes</td></tr>\n')
-        report.write(f'<tr><td>Grand Total Time</td><td>{total_time + afk_time:.1f} minutes</td></tr>\n')
-        report.write('</table>\n')
-
-        events = self.events.get(report_date, [])
-        if events:
-            report.write('<h2>Events</h2>\n<ul>\n')
-            for event in events:
-                status = "Completed" if event['complete'] else "Pending"
-                color = event.get('color', '#FFFFFF')
-                report.write(f'<li style="background-color: {color}; padding: 5px;">{event["text"]} ({status})</li>\n')
-            report.write('</ul>\n')
-
-    def _write_xml_report(self, report, report_date, notes, task_times, session_dir):
-        total_time = 0
-        afk_time = 0
-        all_tasks = self.tasks + ["default"]
-
-        for task in all_tasks:
-            task_notes = [n for n in notes if n["task"] == task]
-            if task_notes:
-                report.write(f' <task name="{task}">\n')
-                for note in task_notes:
-                    subtask_attr = f' subtask="{note["subtask"]}"' if note.get("subtask") else ""
-                    report.write(f' <note task="{task}" timestamp="{note["timestamp"]}"{subtask_attr}>{note["content"]}</note>\n')
-
-                task_time = task_times[task]
-                if task == "default" and any("auto-note" in n["content"] for n in task_notes):
-                    afk_time += task_time
-                else:
-                    total_time += task_time
-
-                report.write(f' <time>{task_time:.1f}</time>\n')
-                task_dir = os.path.join(session_dir, task)
-                if os.path.exists(task_dir):
-                    screenshots = [f for f in os.listdir(task_dir) if f.startswith(f"screenshot_{task}")]
-                    if screenshots:
-                        report.write(' <screenshots>\n')
-                        for shot in screenshots:
-                            report.write(f' <screenshot>{shot}</screenshot>\n')
-                        report.write(' </screenshots>\n')
-                        logger.debug("Agent X: XML logged %d screenshots for %s - Snapshot central!", len(screenshots),
-                                     task)
-                    else:
-                        logger.debug("Agent X: No screenshots in XML for %s - Empty gallery, Picasso!", task)
-                else:
-                    logger.debug("Agent X: No directory for %s in XML - Task vanished, Houdini!", task)
-                report.write(' </task>\n')
-
-        events = self.events.get(report_date, [])
-        if events:
-            report.write(' <events>\n')
-            for event in events:
-                report.write(f' <event complete="{str(event["complete"]).lower()}" color="{event.get("color", "#FFFFFF")}">{event["text"]}</event>\n')
-            report.write(' </events>\n')
-
-        report.write(f' <totals>\n')
-        report.write(f' <productive>{total_time:.1f}</productive>\n')
-        report.write(f' <afk>{afk_time:.1f}</afk>\n')
-        report.write(f' <grand>{total_time + afk_time:.1f}</grand>\n')
-        report.write(f' </totals>\n')
-
     def generate_past_report(self):
         dialog = QDialog(self)
-        dialog.setWindowTitle("Select Date for Past Report")
+        dialog.setWindowTitle("Select Period for Past Report")
         layout = QFormLayout(dialog)
 
+        period_combo = QComboBox()
+        period_combo.addItems(["Day", "Week", "Month", "Range"])
+        layout.addRow("Period:", period_combo)
+
         date_edit = QDateEdit()
         date_edit.setCalendarPopup(True)
         date_edit.setDate(QDate.currentDate().addDays(-1)) # Default to yesterday
         layout.addRow("Select Date:", date_edit)
 
+        end_edit = QDateEdit()
+        end_edit.setCalendarPopup(True)
+        end_edit.setDate(QDate.currentDate())
+        end_edit.setEnabled(False)
+        layout.addRow("Until:", end_edit)
+        period_combo.currentTextChanged.connect(lambda period: end_edit.setEnabled(period == "Range"))
+
         generate_btn = QPushButton("Generate")
-        generate_btn.clicked.connect(lambda: self._process_past_report(date_edit.date().toPyDate(), dialog))
+        generate_btn.clicked.connect(lambda: self._process_past_report(date_edit.date().toPyDate(), dialog,
+                                                                       period_combo.currentText(),
+                                                                       end_edit.date().toPyDate()))
         layout.addWidget(generate_btn)
 
         dialog.exec()
 
-    def _process_past_report(self, selected_date, dialog):
+    def _process_past_report(self, selected_date, dialog, period="Day", end_date=None):
+        from dailies.reports import month_range, week_range
+        if period != "Day":
+            if period == "Week":
+                start, end = week_range(selected_date)
+            elif period == "Month":
+                start, end = month_range(selected_date)
+            else:
+                start, end = min(selected_date, end_date), max(selected_date, end_date)
+            self._generate_range_report(start, end)
+            dialog.close()
+            return
+
         report_date = selected_date.strftime("%Y-%m-%d")
         session_dir = os.path.join(BASE_DIR, report_date)
         if not os.path.exists(session_dir):
             QMessageBox.warning(self, "No Data", f"No session data found for {report_date}.")
             return
 
-        note_filename_xml = os.path.join(session_dir, "notes.xml")
-        if not os.path.exists(note_filename_xml):
-            QMessageBox.warning(self, "No Notes", f"No notes.xml found for {report_date}.")
+        if report_date == self.today:
+            # Today's report comes from the live session, which is ahead of what is on disk
+            self.generate_report()
+        else:
+            self._generate_past_day_report(report_date, session_dir)
+        dialog.close()
+
+    def _generate_past_day_report(self, report_date, session_dir):
+        # Past days are rendered from disk on the write queue, behind any write still pending for that day;
+        # unchanged days come straight from the report cache
+        from dailies.reports import generate_day_report
+        self.status_label.setText(f"building report {report_date}...")
+        written = []
+        self.io_worker.submit(
+            f"report {report_date}",
+            lambda: written.append(generate_day_report(BASE_DIR, report_date, self.task_colors, self.tasks)),
+            callback=lambda ok, error: ok and self._on_past_day_report_written(written[0], report_date, session_dir))
+
+    def _on_past_day_report_written(self, html_path, report_date, session_dir):
+        self.status_label.setText("")
+        if html_path is None:
+            QMessageBox.warning(self, "No Notes", f"No notes found for {report_date}.")
+            return
+        self._on_report_written(True, report_date, session_dir)
+
+    def _generate_range_report(self, start, end):
+        from dailies.reports import generate_range_report
+        self.status_label.setText(f"building report {start} to {end}...")
+        written = []
+        self.io_worker.submit(f"range report {start} to {end}",
+                              lambda: written.append(generate_range_report(BASE_DIR, start, end, self.task_colors)),
+                              callback=lambda ok, error: ok and self._on_range_report_written(written[0]))
+
+    def _on_range_report_written(self, html_path):
+        import webbrowser
+        self.status_label.setText("")
+        webbrowser.open(f"file://{html_path}")
+        QMessageBox.information(self, "Report Generated", f"Range report saved to {os.path.dirname(html_path)}")
+
+    def defer_close_report(self):
+        # The journal is folded into notes.xml and notes.html refreshed at every close, whatever the
+        # policy: few days reach the compaction threshold on their own. "off" only skips the report.
+        policy = self.config["report_on_close"]
+        if policy == "background" and self.spawn_report_job(self.today):
+            return
+        self.add_pending_report(self.today, notes_only=policy == "off")
+
+    def spawn_report_job(self, report_date):
+        # Nobody reads the detached job's stderr, so it logs to the configured file only
+        command = [sys.executable, "-m", "dailies", "--quiet", "report", "--from", report_date, "--compact",
+                   "--base-dir", BASE_DIR]
+        if SHARE_DIR is not None:
+            command.append("--sync")
+        kwargs = {"cwd": os.path.dirname(os.path.abspath(__file__)), "stdin": subprocess.DEVNULL,
+                  "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "close_fds": True}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        try:
+            subprocess.Popen(command, **kwargs)
+        except OSError as e:
+            logger.error("Failed to start background report for %s: %s - Deferring to next start", report_date,
+                         str(e))
+            return False
+        logger.info("Report for %s handed to a background job", report_date)
+        return True
+
+    def pending_reports_path(self):
+        # Local, next to the session index, so recording a pending report never touches the share
+        return os.path.join(os.path.dirname(self.config["index_path"]), "pending_reports")
+
+    def add_pending_report(self, report_date, notes_only=False):
+        # One day per line; "<date> notes" asks only for the compaction and notes.html, not the report
+        try:
+            with open(self.pending_reports_path(), "a", encoding="utf-8") as f:
+                f.write(f"{report_date} {PENDING_NOTES_ONLY}\n" if notes_only else report_date + "\n")
+        except OSError as e:
+            logger.error("Failed to record pending report for %s: %s", report_date, str(e))
+
+    def run_pending_reports(self):
+        path = self.pending_reports_path()
+        if not os.path.exists(path):
+            return
+        pending = {}  # date -> notes only; a day asked for both gets the report
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    fields = line.split()
+                    if fields:
+                        notes_only = fields[1:] == [PENDING_NOTES_ONLY]
+                        pending[fields[0]] = pending.get(fields[0], True) and notes_only
+            os.remove(path)
+        except OSError as e:
+            logger.error("Failed to read pending reports: %s", str(e))
             return
 
-        shifts_filename = os.path.join(session_dir, "shifts.xml")
-        past_shifts = []
-        past_total_lunches = 0.0
-        if os.path.exists(shifts_filename):
-            try:
-                tree = ET.parse(shifts_filename)
-                root = tree.getroot()
-                for shift in root.findall("shift"):
-                    shift_type = shift.get("type")
-                    duration = float(shift.get("duration", 0))
-                    worked = float(shift.get("worked", 0))
-                    past_shifts.append({"type": shift_type, "duration": duration, "worked": worked})
-                    if shift_type == "lunch_in":
-                        past_total_lunches += duration
-            except ET.ParseError:
-                logger.error("Failed to parse past shifts.xml for %s", report_date)
-
-        past_notes = []
-        past_task_times = {task: 0.0 for task in self.task_colors.keys()}
-        if os.path.exists(note_filename_xml):
-            try:
-                tree = ET.parse(note_filename_xml)
-                root = tree.getroot()
-                for note in root.findall("note"):
-                    task = note.get("task")
-                    timestamp = note.get("timestamp")
-                    subtask = note.get("subtask", "")
-                    content = note.text if note.text is not None else ""
-                    past_notes.append({"task": task, "timestamp": timestamp, "subtask": subtask, "content": content})
-                    if content.startswith("Time logged:"):
-                        try:
-                            minutes = float(content.split(" ")[2])
-                            past_task_times[task] += minutes
-                        except (IndexError, ValueError):
-                            logger.error("Failed to parse time from past note: %s", content)
-                logger.info("Loaded %d notes for past report on %s", len(past_notes), report_date)
-            except ET.ParseError:
-                logger.error("Failed to parse past notes.xml for %s", report_date)
-
-        self.generate_report(report_date, session_dir, past_notes, past_task_times, past_shifts, past_total_lunches)
-        dialog.close()
+        # Today's journal is live again; it is finished at this session's close
+        pending.pop(self.today, None)
+        if not pending:
+            return
+        logger.info("Rendering %d deferred reports in the background", len(pending))
+        for report_date in sorted(pending):
+            # One job per day, so the session's own writes are never queued behind the whole backlog
+            self.io_worker.submit(f"deferred report {report_date}", self._finish_day, report_date,
+                                  pending[report_date])
+
+    def _finish_day(self, report_date, notes_only):
+        from dailies.reports import finish_day_notes, finish_day_report
+        if notes_only:
+            finish_day_notes(BASE_DIR, report_date, self.task_colors)
+        else:
+            finish_day_report(BASE_DIR, report_date, self.task_colors, self.tasks)
+        if self.sync is not None:
+            self.sync.mark_dirty(report_date)
 
     def log_ui(self, message):
         self.log_text.append(message)
 
     def closeEvent(self, event):
+        # No periodic job may fire from the dialogs' event loops below or land after the queue closes
+        self.closing = True
+        self.running = False
+        self.tick_timer.stop()
+        self.event_writes.flush()
         if self.clock_in_time:
             reply = QMessageBox.question(self, "Still Clocked In", "You are still clocked in. Clock out now?",
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
@@ -1103,29 +1496,41 @@ border-right: 1px solid black;\
             if reply == QMessageBox.StandardButton.Yes:
                 self.lunch_in()
 
-        if self.current_task_start:
-            elapsed = (time.time() - self.current_task_start) / 60.0
-            self.task_times[self.current_task] += elapsed
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.notes.append({"task": self.current_task, "timestamp": timestamp,
-                               "content": f"Time logged: {elapsed:.1f} minutes for {self.current_task}", "subtask": ""})
-            logger.debug("Agent X: Logged %.1f minutes for %s on close - Shutdown logged, HAL 9000 out!", elapsed,
-                         self.current_task)
+        span = self.ledger.close(time.time(), subtask=self.current_subtask)
+        self.record_span(span)
+        if span and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Agent X: Logged %.1f minutes for %s on close - Shutdown logged, HAL 9000 out!",
+                         (span[3] - span[2]) / 60.0, span[0])
 
         shutdown_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.notes.append({"task": "default", "timestamp": shutdown_time.split(" ")[1],
-                           "content": f"the program shut down at {shutdown_time}", "subtask": ""})
-        self.update_notes_files()
-
-        # Auto-generate report on close
-        self.generate_report()
-
-        self.running = False
+        self.append_note(Note("default", shutdown_time.split(" ")[1], f"{SHUTDOWN_MARKER}{shutdown_time}"))
+
+        # Let in-flight screenshots land, then journal their paths
+        if self._screenshots is not None:
+            self._screenshots.shutdown(wait=True)
+        QApplication.processEvents()
+
+        # Flush-on-close guarantee: every queued journal record lands before we exit. Compaction and the
+        # report are left to a job that runs after the window is gone, so logoff never waits on the share.
+        self.io_worker.close()
+        QApplication.processEvents()
+        self.defer_close_report()
+
+        logger.info("%s", self.scheduler.report())
+        if METRICS.enabled:
+            logger.info("%s", METRICS.report())
+            self.dump_metrics()
         logger.debug("Agent X: Shutting down operations - Hasta la vista, baby!")
         event.accept()
 
 if __name__ == "__main__":
+    # Logging is set up here rather than at import: the GUI thread only enqueues records
+    log_listener = setup_logging(CONFIG["log_level"], CONFIG["log_path"], CONFIG["log_max_bytes"],
+                                 CONFIG["log_backups"], CONFIG["log_console"])
     app = QApplication(sys.argv)
+    STARTUP.mark("create application")
     window = DailiesApp()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    exit_code = app.exec()
+    log_listener.stop()
+    sys.exit(exit_code)
\ No newline at end of file
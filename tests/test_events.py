@@ -0,0 +1,21 @@
+import threading
+
+from dailies.events import MonthEventStore
+
+
+def test_months_load_on_the_prefetch_thread():
+    loaded_on = []
+
+    def loader(year, month):
+        loaded_on.append(threading.current_thread().name)
+        return {f"{year:04d}-{month:02d}-01": [{"text": "Standup", "complete": False, "color": "#FFFFFF"}]}
+
+    store = MonthEventStore(loader, capacity=3)
+    try:
+        store.prefetch(2025, 1)
+        assert store.get("2025-02-01")[0]["text"] == "Standup"  # waited for, not loaded here
+        assert store.month(2025, 1) is store.month(2025, 1)
+        assert loaded_on and all(name.startswith("EventPrefetch") for name in loaded_on)
+        assert len(loaded_on) == 2
+    finally:
+        store.shutdown()
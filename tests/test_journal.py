@@ -0,0 +1,31 @@
+from dailies.journal import Note, NoteJournal
+
+COLORS = {"code": "#FFFFFF"}
+
+
+def test_own_appends_leave_nothing_to_merge(tmp_path):
+    journal = NoteJournal(str(tmp_path), "2025-01-01", COLORS)
+    journal.load()
+    assert not journal.has_unread_tail()
+    journal.append(Note("code", "09:00:00", "first"))
+    journal.attach_screenshot(Note("code", "09:00:00", "first"), "code/shot.png")
+    assert not journal.has_unread_tail()
+
+
+def test_other_writer_is_seen_and_merged(tmp_path):
+    ours = NoteJournal(str(tmp_path), "2025-01-01", COLORS)
+    theirs = NoteJournal(str(tmp_path), "2025-01-01", COLORS)
+    ours.load()
+    theirs.load()
+    ours.append(Note("code", "09:00:00", "ours"))
+    theirs.append(Note("code", "09:01:00", "theirs"))
+    assert ours.has_unread_tail()
+
+    ours.pull_tail()
+    assert [r["content"] for r in ours.take_merged()] == ["theirs"]
+    assert not ours.has_unread_tail()
+    # Appending after someone else wrote still reads their line first, and then ours is caught up too
+    theirs.append(Note("code", "09:02:00", "theirs again"))
+    ours.append(Note("code", "09:03:00", "ours again"))
+    assert [r["content"] for r in ours.take_merged()] == ["theirs again"]
+    assert not ours.has_unread_tail()
@@ -0,0 +1,79 @@
+import os
+import json
+
+from dailies.ledger import CHECKPOINT_PREFIX, HOSTNAME, TimeLedger, checkpoint_filename, day_spans, span_totals
+
+START = 1_700_000_000.0
+
+
+def _write_checkpoint(path, span):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(list(span), f)
+
+
+def test_live_instance_checkpoint_is_not_adopted(tmp_path):
+    # A second instance starting mid-session must leave the first one's open span alone
+    session_dir = str(tmp_path)
+    first = TimeLedger(session_dir)
+    first.checkpoint_path = checkpoint_filename(session_dir, pid=os.getppid())
+    first.start("code", "", START)
+    first.write_checkpoint(first.open_span(START + 30 * 60))
+
+    second = TimeLedger(session_dir)
+    second.load("2023-11-14", [], now=START + 30 * 60)
+    assert second.spans == []
+
+    first.write_span(first.close(START + 60 * 60))
+    assert span_totals(day_spans(session_dir, "2023-11-14", [])) == {"code": 60.0}
+
+
+def test_abandoned_checkpoint_is_adopted_once(tmp_path):
+    session_dir = str(tmp_path)
+    span = ("code", "ticket-1", START, START + 600)
+    _write_checkpoint(checkpoint_filename(session_dir, host=HOSTNAME + "-elsewhere", pid=1), span)
+
+    ledger = TimeLedger(session_dir, stale_after=300)
+    ledger.load("2023-11-14", [], now=START + 3600)
+    assert ledger.spans == [span]
+    assert not any(name.startswith(CHECKPOINT_PREFIX) for name in os.listdir(session_dir))
+
+    again = TimeLedger(session_dir, stale_after=300)
+    again.load("2023-11-14", [], now=START + 3600)
+    assert again.spans == [span]
+
+
+def test_legacy_checkpoint_waits_until_stale(tmp_path):
+    session_dir = str(tmp_path)
+    span = ("meeting", "", START, START + 600)
+    _write_checkpoint(os.path.join(session_dir, CHECKPOINT_PREFIX), span)
+
+    ledger = TimeLedger(session_dir, stale_after=300)
+    ledger.load("2023-11-14", [], now=START + 700)
+    assert ledger.spans == []
+    ledger.load("2023-11-14", [], now=START + 1000)
+    assert ledger.spans == [span]
+
+
+def test_sub_resolution_interval_records_no_span(tmp_path):
+    ledger = TimeLedger(str(tmp_path))
+    ledger.start("code", "", START + 0.11)
+    assert ledger.open_span(START + 0.14) is None
+    assert ledger.close(START + 0.14) is None
+    assert ledger.spans == []
+
+    ledger.start("code", "", START + 0.11)
+    assert ledger.close(START + 0.26) == ("code", "", START + 0.1, START + 0.3)
+
+
+def test_shutdown_gap_starts_after_recorded_time(tmp_path):
+    # Shut down at 10:00, a session from 10:05 crashed at 11:59 and was adopted, restarted at 12:30
+    session_dir = str(tmp_path)
+    shutdown, crashed = START, ("code", "", START + 5 * 60, START + 119 * 60)
+    _write_checkpoint(checkpoint_filename(session_dir, host=HOSTNAME + "-elsewhere", pid=1), crashed)
+    ledger = TimeLedger(session_dir, stale_after=300)
+    ledger.load("2023-11-14", [], now=START + 150 * 60)
+
+    gap = ledger.bridge_gap(shutdown, START + 150 * 60)
+    assert gap == ("default", "", START + 119 * 60, START + 150 * 60)
+    assert span_totals(ledger.spans) == {"code": 114.0, "default": 31.0}
+    assert ledger.bridge_gap(shutdown, START + 100 * 60) is None
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import threading
+
+from dailies.journal import Note, NoteJournal, read_journal
+from dailies.ledger import HOSTNAME
+from dailies.sync import CONFLICT_SUFFIX, LOCK_FILENAME, Synchronizer
+
+DAY = "2025-01-06"
+
+
+def _write(root, rel, text, mtime=None):
+    path = os.path.join(root, *rel.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def _read(root, rel):
+    with open(os.path.join(root, *rel.split("/")), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _dirs(tmp_path):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    local.mkdir()
+    remote.mkdir()
+    return str(local), str(remote)
+
+
+def test_push_and_pull(tmp_path):
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/shifts.xml", "local shifts")
+    _write(remote, f"{DAY}/events.xml", "remote events")
+    _write(remote, f"{DAY}/code/screenshot_code_09-00-00.png", "png")
+
+    result = Synchronizer(local, remote).sync()
+    assert (result.pushed, result.pulled, result.conflicts) == (1, 2, [])
+    assert _read(remote, f"{DAY}/shifts.xml") == "local shifts"
+    assert _read(local, f"{DAY}/events.xml") == "remote events"
+    assert _read(local, f"{DAY}/code/screenshot_code_09-00-00.png") == "png"
+    assert result.changed_local == {f"{DAY}/events.xml", f"{DAY}/code/screenshot_code_09-00-00.png"}
+
+    again = Synchronizer(local, remote).sync()
+    assert (again.pushed, again.pulled) == (0, 0)
+
+
+def test_unchanged_days_are_skipped_on_full_sync(tmp_path):
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/shifts.xml", "shifts")
+    sync = Synchronizer(local, remote)
+    sync.sync()
+    assert sync.sync().skipped_days == 1
+    _write(remote, f"{DAY}/events.xml", "new on the share")
+    result = sync.sync()
+    assert (result.skipped_days, result.pulled) == (0, 1)
+
+
+def test_union_merge_keeps_both_sides(tmp_path):
+    local, remote = _dirs(tmp_path)
+    rel = f"{DAY}/notes.journal"
+    _write(local, rel, "a\n")
+    sync = Synchronizer(local, remote)
+    sync.sync()
+    with open(os.path.join(local, DAY, "notes.journal"), "a", encoding="utf-8") as f:
+        f.write("b\n")
+    with open(os.path.join(remote, DAY, "notes.journal"), "a", encoding="utf-8") as f:
+        f.write("c\n")
+
+    result = sync.sync([DAY])
+    assert result.merged == 1
+    assert _read(local, rel).splitlines() == ["a", "b", "c"]
+    assert _read(remote, rel).splitlines() == ["a", "c", "b"]
+    settled = sync.sync([DAY])
+    assert (settled.pushed, settled.pulled, settled.merged) == (0, 0, 0)
+    assert sync.sync([DAY]).merged == 0
+
+
+def test_newer_wins_and_older_is_kept_as_conflict(tmp_path):
+    local, remote = _dirs(tmp_path)
+    rel = f"{DAY}/shifts.xml"
+    _write(local, rel, "base")
+    sync = Synchronizer(local, remote)
+    sync.sync()
+    now = time.time()
+    _write(local, rel, "older local edit", mtime=now - 60)
+    _write(remote, rel, "newer remote edit", mtime=now)
+
+    result = sync.sync([DAY])
+    assert result.conflicts == [rel]
+    assert _read(local, rel) == "newer remote edit"
+    assert _read(local, rel + CONFLICT_SUFFIX) == "older local edit"
+    assert rel in result.changed_local
+
+
+def test_deletes_propagate_but_local_journals_are_kept(tmp_path):
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/events.xml", "events")
+    _write(local, f"{DAY}/notes.journal", "a\n")
+    sync = Synchronizer(local, remote)
+    sync.sync()
+
+    os.remove(os.path.join(remote, DAY, "events.xml"))
+    os.remove(os.path.join(remote, DAY, "notes.journal"))
+    result = sync.sync([DAY])
+    assert result.deleted == 1
+    assert not os.path.exists(os.path.join(local, DAY, "events.xml"))
+    # The app may be appending to its journal; sync never deletes it
+    assert _read(local, f"{DAY}/notes.journal") == "a\n"
+
+    _write(local, f"{DAY}/shifts.xml", "shifts")
+    sync.sync([DAY])
+    os.remove(os.path.join(local, DAY, "shifts.xml"))
+    assert sync.sync([DAY]).deleted == 1
+    assert not os.path.exists(os.path.join(remote, DAY, "shifts.xml"))
+
+
+def test_second_syncer_skips_while_another_process_holds_the_lock(tmp_path):
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/shifts.xml", "shifts")
+    _write(local, LOCK_FILENAME, f"{HOSTNAME} {os.getppid()}")
+    sync = Synchronizer(local, remote)
+    result = sync.sync([DAY])
+    assert result.busy and result.pushed == 0
+    assert not os.path.exists(os.path.join(remote, DAY))
+
+    os.remove(os.path.join(local, LOCK_FILENAME))
+    assert sync.sync([]).pushed == 1  # the skipped day was kept for the next pass
+    assert not os.path.exists(os.path.join(local, LOCK_FILENAME))
+
+
+def test_lock_left_by_a_dead_process_is_taken_over(tmp_path):
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/shifts.xml", "shifts")
+    _write(local, LOCK_FILENAME, f"{HOSTNAME} {os.getpid()}")  # a previous process with our pid
+    result = Synchronizer(local, remote).sync()
+    assert not result.busy and result.pushed == 1
+
+
+def test_syncers_in_turn_pick_up_each_others_state(tmp_path):
+    # The app's synchronizer and the close job's run one after the other on the same store
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/shifts.xml", "v1", mtime=time.time() - 10)
+    app = Synchronizer(local, remote)
+    app.sync([DAY])
+    _write(local, f"{DAY}/shifts.xml", "v2")
+    assert Synchronizer(local, remote).sync([DAY]).pushed == 1
+
+    result = app.sync([DAY])
+    assert (result.pushed, result.pulled, result.conflicts) == (0, 0, [])
+    assert not os.path.exists(os.path.join(local, DAY, "shifts.xml" + CONFLICT_SUFFIX))
+
+
+def test_checkpoints_are_not_synced(tmp_path):
+    local, remote = _dirs(tmp_path)
+    _write(local, f"{DAY}/time.ledger.open.host.123", "[]")
+    Synchronizer(local, remote).sync()
+    assert not os.path.exists(os.path.join(remote, DAY))
+
+
+def test_concurrent_appends_survive_sync(tmp_path):
+    # The app's write thread keeps journaling while the sync thread merges with a share that another
+    # machine is writing to as well; nothing may be lost or torn on either side
+    local, remote = _dirs(tmp_path)
+    local_dir, remote_dir = os.path.join(local, DAY), os.path.join(remote, DAY)
+    os.makedirs(local_dir)
+    os.makedirs(remote_dir)
+    journal = NoteJournal(local_dir, DAY, {})
+    journal.load()
+    sync = Synchronizer(local, remote,
+                        local_lock=lambda path: journal._lock if path == journal.path else None)
+    count = 1500
+    done = threading.Event()
+
+    def write_local():
+        for i in range(count):
+            journal.append(Note("code", f"{i:06d}", f"local {i}"))
+
+    def write_remote():
+        # Another machine's sync appending whole lines to the share
+        for i in range(count):
+            record = {"task": "meeting", "timestamp": f"{i:06d}", "subtask": "", "content": f"remote {i}"}
+            with open(os.path.join(remote_dir, "notes.journal"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def run_sync():
+        while not done.is_set():
+            sync.sync([DAY])
+
+    writers = [threading.Thread(target=write_local), threading.Thread(target=write_remote)]
+    syncer = threading.Thread(target=run_sync)
+    syncer.start()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    syncer.join()
+    sync.sync([DAY])
+
+    for day_dir in (local_dir, remote_dir):
+        with open(os.path.join(day_dir, "notes.journal"), "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert all(json.loads(line) for line in lines)  # no torn lines
+        contents = [record["content"] for record in read_journal(os.path.join(day_dir, "notes.journal"))]
+        assert len(set(contents)) == len(contents) == 2 * count